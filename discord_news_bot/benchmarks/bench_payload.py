@@ -0,0 +1,67 @@
+"""
+Micro-benchmark for the Discord payload builder.
+
+Usage: python benchmarks/bench_payload.py [iterations]
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.append(
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "../src/lambda"))
+)
+
+from discord_payload import build_webhook_payload, strip_html  # noqa: E402
+from discord_poster import format_bluesky_embed  # noqa: E402
+
+TYPICAL_POST = {
+    "title": "Council approves new transit plan for downtown corridor...",
+    "content": "Council approves new transit plan for downtown corridor. " * 3,
+    "post_url": "https://example.com/news/transit-plan",
+    "author_name": "City Desk",
+    "author_handle": "citydesk.bsky.social",
+    "author_avatar": "https://cdn.example.com/avatar.jpg",
+    "bluesky_link": "https://bsky.app/profile/citydesk.bsky.social/post/abc",
+    "image_url": "https://cdn.example.com/thumb.jpg",
+    "likes": 12,
+    "reposts": 3,
+    "replies": 1,
+    "quotes": 0,
+}
+
+OVERSIZED_HTML = "<p>" + "Lorem ipsum <b>dolor</b> sit &amp; amet. " * 400 + "</p>"
+
+
+def bench_fast_path():
+    build_webhook_payload(
+        format_bluesky_embed(TYPICAL_POST),
+        username=TYPICAL_POST["author_name"],
+        avatar_url=TYPICAL_POST["author_avatar"],
+        thread_name=TYPICAL_POST["title"],
+    )
+
+
+def bench_oversized_html():
+    build_webhook_payload(
+        [
+            {
+                "title": "RSS " * 100,
+                "description": strip_html(OVERSIZED_HTML),
+                "url": "",
+            }
+        ]
+        * 3,
+        username="News Bot",
+        thread_name="RSS " * 100,
+    )
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    for name, func in (
+        ("fast path (typical Bluesky post)", bench_fast_path),
+        ("slow path (oversized RSS HTML)", bench_oversized_html),
+    ):
+        seconds = timeit.timeit(func, number=iterations)
+        print(f"{name}: {seconds / iterations * 1e6:.1f} µs/payload")
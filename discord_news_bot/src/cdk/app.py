@@ -15,6 +15,29 @@ env = Environment(
 
 app_name = os.getenv("APP_NAME")
 
-DiscordNewsBotStack(app, f"{app_name}DiscordNewsBotStack", env=env, app_name=app_name)
+# Bot settings passed through to the Lambda when set (see .env.template)
+LAMBDA_SETTINGS = (
+    "MAX_POSTS_PER_RUN",
+    "MAX_POSTS_PER_HOUR",
+    "MAX_POSTS_PER_FEED",
+    "MAX_DEFERRED_POSTS",
+    "MAX_DEFERRED_AGE_HOURS",
+    "RECENCY_HALF_LIFE_HOURS",
+    "STORY_CLUSTERING",
+    "STORY_MAX_DISTANCE",
+    "STORY_INDEX_TTL_HOURS",
+    "STORY_INDEX_MAX_SIZE",
+)
+
+DiscordNewsBotStack(
+    app,
+    f"{app_name}DiscordNewsBotStack",
+    env=env,
+    app_name=app_name,
+    memory_size=int(os.getenv("LAMBDA_MEMORY_MB", 512)),
+    architecture=os.getenv("LAMBDA_ARCHITECTURE", "x86_64"),
+    packaging=os.getenv("LAMBDA_PACKAGING", "layered"),
+    settings={k: os.environ[k] for k in LAMBDA_SETTINGS if os.getenv(k)},
+)
 
 app.synth()
@@ -1,5 +1,7 @@
+import hashlib
 import os
 from aws_cdk import (
+    AssetHashType,
     Stack,
     CfnOutput,
     aws_apigatewayv2 as apigw,
@@ -17,11 +19,55 @@ from aws_cdk import (
 )
 from constructs import Construct
 
+ARCHITECTURES = {
+    "x86_64": _lambda.Architecture.X86_64,
+    "arm64": _lambda.Architecture.ARM_64,
+}
+
+# Strip tests and stale bytecode from the bundle, then precompile it. The
+# unchecked-hash mode keeps the .pyc files valid regardless of file mtimes.
+SLIM_AND_COMPILE = """\
+find {path} -type d \\( -name tests -o -name test -o -name __pycache__ \\) \
+    -prune -exec rm -rf {{}} + && \
+python -m compileall -q -j 0 --invalidation-mode unchecked-hash {path}"""
+
+# boto3/botocore are provided by the Lambda Python runtime
+LAYER_EXCLUDED_REQUIREMENTS = "^(boto3|botocore)$"
+
+SOURCE_EXCLUDES = ["requirements.txt", "**/__pycache__", "**/*.pyc"]
+
 
 class DiscordNewsBotStack(Stack):
-    def __init__(self, scope: Construct, construct_id: str, app_name: str, **kwargs):
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        app_name: str,
+        memory_size: int = 512,
+        architecture: str = "x86_64",
+        packaging: str = "layered",
+        settings: dict = None,
+        **kwargs,
+    ):
+        """
+        packaging="layered" puts third-party dependencies in a Lambda layer
+        that is only rebuilt when requirements.txt changes, and ships the
+        bot's own code as a small separate asset. packaging="single" keeps
+        everything in one asset. `settings` are extra environment variables
+        for the function (e.g. posting budgets).
+        """
         super().__init__(scope, construct_id, **kwargs)
 
+        if architecture not in ARCHITECTURES:
+            raise ValueError(
+                f"Unsupported architecture {architecture!r}. "
+                f"Use one of: {', '.join(ARCHITECTURES)}"
+            )
+        if packaging not in ("layered", "single"):
+            raise ValueError(
+                f"Unsupported packaging {packaging!r}. Use 'layered' or 'single'."
+            )
+
         # Import API Gateway ID and Endpoint from Shared Stack
         api_gateway_id = Fn.import_value("ApiGatewayId")
         api_endpoint = Fn.import_value("ApiGatewayEndpoint")
@@ -73,15 +119,70 @@ class DiscordNewsBotStack(Stack):
             os.path.join(os.path.dirname(__file__), "../")
         )
 
-        news_bot_lambda = _lambda.Function(
-            self,
-            f"{app_name}NewsBotLambda",
-            runtime=_lambda.Runtime.PYTHON_3_11,
-            handler="news_bot_main.lambda_handler",
-            code=_lambda.Code.from_asset(
-                lambda_code_path + "/lambda",
+        runtime = _lambda.Runtime.PYTHON_3_11
+        lambda_architecture = ARCHITECTURES[architecture]
+        source_path = lambda_code_path + "/lambda"
+        bundling_platform = f"linux/{'arm64' if architecture == 'arm64' else 'amd64'}"
+
+        if packaging == "layered":
+            layer_command = f"""grep -v -E '{LAYER_EXCLUDED_REQUIREMENTS}' \
+                requirements.txt > /tmp/requirements.txt && \
+            pip install \
+                --cache-dir=/tmp/.pip-cache \
+                --no-compile \
+                -r /tmp/requirements.txt \
+                -t /asset-output/python && \
+            {SLIM_AND_COMPILE.format(path="/asset-output/python")}"""
+
+            requirements_path = os.path.join(source_path, "requirements.txt")
+            with open(requirements_path, "rb") as f:
+                # Only rebuild/re-upload the layer when the dependencies or
+                # the way they are built change
+                layer_hash = hashlib.sha256(
+                    f.read() + architecture.encode() + layer_command.encode()
+                ).hexdigest()
+
+            dependencies_layer = _lambda.LayerVersion(
+                self,
+                f"{app_name}NewsBotDependenciesLayer",
+                code=_lambda.Code.from_asset(
+                    source_path,
+                    asset_hash_type=AssetHashType.CUSTOM,
+                    asset_hash=layer_hash,
+                    bundling=BundlingOptions(
+                        image=runtime.bundling_image,
+                        platform=bundling_platform,
+                        command=["bash", "-c", layer_command],
+                    ),
+                ),
+                compatible_runtimes=[runtime],
+                compatible_architectures=[lambda_architecture],
+                description="Third-party dependencies for the News Bot",
+            )
+            layers = [dependencies_layer]
+
+            code = _lambda.Code.from_asset(
+                source_path,
+                exclude=SOURCE_EXCLUDES,
                 bundling=BundlingOptions(
-                    image=_lambda.Runtime.PYTHON_3_11.bundling_image,
+                    image=runtime.bundling_image,
+                    platform=bundling_platform,
+                    command=[
+                        "bash",
+                        "-c",
+                        f"""cp -r . /asset-output && \
+                        rm -f /asset-output/requirements.txt && \
+                        {SLIM_AND_COMPILE.format(path="/asset-output")}""",
+                    ],
+                ),
+            )
+        else:
+            layers = []
+            code = _lambda.Code.from_asset(
+                source_path,
+                bundling=BundlingOptions(
+                    image=runtime.bundling_image,
+                    platform=bundling_platform,
                     command=[
                         "bash",
                         "-c",
@@ -92,7 +193,16 @@ class DiscordNewsBotStack(Stack):
                         cp -r . /asset-output""",
                     ],
                 ),
-            ),
+            )
+
+        news_bot_lambda = _lambda.Function(
+            self,
+            f"{app_name}NewsBotLambda",
+            runtime=runtime,
+            architecture=lambda_architecture,
+            handler="news_bot_main.lambda_handler",
+            code=code,
+            layers=layers,
             role=news_bot_lambda_role,
             environment={
                 "DISCORD_BOT_SECRET_ARN": news_discord_bot_secret.secret_arn,
@@ -100,9 +210,10 @@ class DiscordNewsBotStack(Stack):
                 "BLUESKY_SECRET_ARN": news_bluesky_secret.secret_arn,
                 "S3_BUCKET": news_bucket.bucket_name,
                 "LOG_LEVEL": "DEBUG",
+                **(settings or {}),
             },
             timeout=Duration.seconds(300),
-            memory_size=512
+            memory_size=memory_size,
         )
 
         # Add a Scheduled Event for News Bot
@@ -0,0 +1,181 @@
+"""
+Long-running entry point for running the News Bot as a container service.
+
+Runs the same fetch -> select -> deliver pipeline as the scheduled Lambda on
+an internal timer, keeps state in memory with periodic S3 snapshots, and
+serves the Discord interaction endpoint from the same process.
+
+Usage: python daemon.py
+"""
+
+import asyncio
+import json
+import logging
+import os
+import signal
+import time
+import state_store
+from news_bot_main import handle_interaction, process_scheduled_event
+
+# Daemon Configuration
+POLL_INTERVAL_SECONDS = float(os.getenv("POLL_INTERVAL_SECONDS", 60))
+SNAPSHOT_INTERVAL_SECONDS = float(os.getenv("SNAPSHOT_INTERVAL_SECONDS", 300))
+DAEMON_HOST = os.getenv("DAEMON_HOST", "0.0.0.0")
+DAEMON_PORT = int(os.getenv("DAEMON_PORT", 8080))
+INTERACTION_PATH = os.getenv("INTERACTION_PATH", "/news-bot")
+REQUEST_TIMEOUT_SECONDS = float(os.getenv("REQUEST_TIMEOUT_SECONDS", 10))
+MAX_REQUEST_BYTES = 1024 * 1024
+
+# Configure Logging
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+logging.basicConfig(level=LOG_LEVEL)
+logger = logging.getLogger()
+
+HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    408: "Request Timeout",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+async def wait_or_stop(stop, seconds):
+    """Sleeps for `seconds`, returning early (True) if the daemon is stopping."""
+    try:
+        await asyncio.wait_for(stop.wait(), timeout=max(seconds, 0))
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+async def poll_loop(stop):
+    """
+    Runs the news pipeline every POLL_INTERVAL_SECONDS. Runs never overlap;
+    a run that overruns the interval is followed immediately by the next.
+    """
+    while not stop.is_set():
+        started = time.monotonic()
+        # The pipeline is blocking (requests, boto3, feedparser), so keep it
+        # off the event loop to leave the interaction endpoint responsive.
+        result = await asyncio.to_thread(process_scheduled_event)
+        elapsed = time.monotonic() - started
+        logger.info(
+            f"⏱️ Poll finished in {elapsed:.1f}s with status {result['statusCode']}"
+        )
+        if await wait_or_stop(stop, POLL_INTERVAL_SECONDS - elapsed):
+            break
+
+
+async def snapshot_loop(stop):
+    """Flushes in-memory state to S3 every SNAPSHOT_INTERVAL_SECONDS."""
+    while not await wait_or_stop(stop, SNAPSHOT_INTERVAL_SECONDS):
+        await asyncio.to_thread(state_store.flush)
+
+
+async def read_request(reader):
+    """
+    Reads one HTTP/1.1 request. Returns (method, path, headers, body) with
+    lower-cased header names, or None for a malformed request.
+    """
+    request_line = await reader.readline()
+    parts = request_line.decode("latin-1").split()
+    if len(parts) != 3:
+        return None
+    method, path, _ = parts
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    length = headers.get("content-length", "0")
+    if not length.isdigit():
+        return None
+    length = int(length)
+    if length > MAX_REQUEST_BYTES:
+        raise ValueError("Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, path.split("?")[0], headers, body.decode("utf-8")
+
+
+def route_request(method, path, headers, body):
+    """Maps an HTTP request to a Lambda-style {statusCode, body} response."""
+    if method == "GET" and path == "/health":
+        return {"statusCode": 200, "body": json.dumps({"status": "ok"})}
+    if method != "POST" or path != INTERACTION_PATH:
+        return {"statusCode": 404, "body": "Not Found"}
+
+    response = handle_interaction({"headers": headers, "body": body})
+    return response or {"statusCode": 400, "body": "Unknown event type"}
+
+
+async def handle_connection(reader, writer):
+    try:
+        try:
+            # Don't let idle or slow clients hold connections open
+            request = await asyncio.wait_for(
+                read_request(reader), REQUEST_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            request = None
+            response = {"statusCode": 408, "body": "Request Timeout"}
+        except ValueError:
+            request = None
+            response = {"statusCode": 413, "body": "Payload Too Large"}
+        else:
+            response = {"statusCode": 400, "body": "Bad Request"}
+
+        if request:
+            try:
+                # Signature verification and secret lookups block, so run
+                # them off the event loop
+                response = await asyncio.to_thread(route_request, *request)
+            except Exception as e:
+                logger.error(f"❌ Error handling {request[0]} {request[1]}: {e}")
+                response = {"statusCode": 500, "body": "Internal Server Error"}
+
+        status = response["statusCode"]
+        body = response.get("body", "").encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+    except Exception as e:
+        logger.error(f"❌ Error handling HTTP request: {e}")
+    finally:
+        writer.close()
+
+
+async def main():
+    state_store.enable_write_behind()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    server = await asyncio.start_server(handle_connection, DAEMON_HOST, DAEMON_PORT)
+    logger.info(
+        f"🚀 News Bot daemon listening on {DAEMON_HOST}:{DAEMON_PORT}"
+        f"{INTERACTION_PATH}, polling every {POLL_INTERVAL_SECONDS:g}s"
+    )
+
+    async with server:
+        await asyncio.gather(poll_loop(stop), snapshot_loop(stop))
+
+    logger.info("🛑 Shutting down. Writing final state snapshot...")
+    await asyncio.to_thread(state_store.flush)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,244 @@
+import html
+import logging
+import re
+
+logger = logging.getLogger()
+
+# Discord API Limits
+# https://discord.com/developers/docs/resources/message#embed-object-embed-limits
+MAX_CONTENT = 2000
+MAX_USERNAME = 80
+MAX_THREAD_NAME = 100
+MAX_EMBEDS = 10
+MAX_EMBED_TITLE = 256
+MAX_EMBED_DESCRIPTION = 4096
+MAX_EMBED_FIELDS = 25
+MAX_FIELD_NAME = 256
+MAX_FIELD_VALUE = 1024
+MAX_FOOTER_TEXT = 2048
+MAX_AUTHOR_NAME = 256
+MAX_EMBED_TOTAL = 6000
+
+ELLIPSIS = "…"
+DEFAULT_USERNAME = "News Bot"
+# Webhook username overrides containing these (case-insensitive) get a 400
+FORBIDDEN_USERNAME_SUBSTRINGS = ("discord", "clyde")
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_BLOCK_TAG_RE = re.compile(r"<\s*(br|/p|/div|/li|/h[1-6])\b[^>]*>", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"[ \t\r\f\v]+")
+_BLANK_LINES_RE = re.compile(r"\n\s*\n+")
+
+
+def strip_html(text):
+    """
+    Converts an HTML fragment (e.g. an RSS summary) to plain text.
+    """
+    if not text:
+        return ""
+    if "<" not in text and "&" not in text:
+        return text.strip()  # ✅ Fast path: nothing to strip
+
+    text = _BLOCK_TAG_RE.sub("\n", text)
+    text = _TAG_RE.sub("", text)
+    text = html.unescape(text)
+    text = _WHITESPACE_RE.sub(" ", text)
+    text = _BLANK_LINES_RE.sub("\n\n", text)
+    return "\n".join(line.strip() for line in text.split("\n")).strip()
+
+
+def truncate(text, limit):
+    """
+    Truncates text to at most `limit` characters, cutting at a word boundary
+    and appending an ellipsis when anything was removed.
+    """
+    if text is None:
+        return ""
+    text = str(text)
+    if len(text) <= limit:
+        return text
+    if limit <= len(ELLIPSIS):
+        return text[:limit]
+
+    cut = text[: limit - len(ELLIPSIS)]
+    boundary = max(cut.rfind(" "), cut.rfind("\n"))
+    # Only back up to a word boundary if it doesn't throw away most of the text
+    if boundary >= len(cut) * 0.8:
+        cut = cut[:boundary]
+    return cut.rstrip() + ELLIPSIS
+
+
+def _is_url(value):
+    return isinstance(value, str) and value.startswith(("http://", "https://"))
+
+
+def _embed_length(embed):
+    """Counts the characters Discord includes in the 6000 character embed total."""
+    length = len(embed.get("title", "")) + len(embed.get("description", ""))
+    length += len(embed.get("footer", {}).get("text", ""))
+    length += len(embed.get("author", {}).get("name", ""))
+    for field in embed.get("fields", []):
+        length += len(field.get("name", "")) + len(field.get("value", ""))
+    return length
+
+
+def _text_fits(value, limit, min_length=0):
+    return isinstance(value, str) and min_length <= len(value) <= limit
+
+
+def _media_fits(embed, key):
+    return key not in embed or (
+        isinstance(embed[key], dict) and _is_url(embed[key].get("url"))
+    )
+
+
+def _embed_fits(embed):
+    """
+    Fast check for embeds that already satisfy every per-embed limit.
+    Anything that isn't plain text (e.g. a None title) takes the slow path.
+    """
+    author = embed.get("author")
+    footer = embed.get("footer")
+    return (
+        "fields" not in embed
+        and _text_fits(embed.get("title", ""), MAX_EMBED_TITLE)
+        and _text_fits(embed.get("description", ""), MAX_EMBED_DESCRIPTION)
+        and ("url" not in embed or _is_url(embed["url"]))
+        and _media_fits(embed, "image")
+        and _media_fits(embed, "thumbnail")
+        and (
+            author is None
+            or (
+                isinstance(author, dict)
+                and _text_fits(author.get("name"), MAX_AUTHOR_NAME, min_length=1)
+                and all(
+                    _is_url(author[key]) for key in ("url", "icon_url") if key in author
+                )
+            )
+        )
+        and (
+            footer is None
+            or (
+                isinstance(footer, dict)
+                and _text_fits(footer.get("text"), MAX_FOOTER_TEXT, min_length=1)
+                and ("icon_url" not in footer or _is_url(footer["icon_url"]))
+            )
+        )
+    )
+
+
+def sanitize_embed(embed):
+    """
+    Returns a copy of the embed with every field clamped to Discord's limits.
+    Empty or malformed URLs are dropped since Discord rejects them outright.
+    """
+    if _embed_fits(embed):
+        return dict(embed)
+
+    clean = {}
+    for key, value in embed.items():
+        if key == "url":
+            if _is_url(value):
+                clean[key] = value
+        elif key in ("image", "thumbnail"):
+            if isinstance(value, dict) and _is_url(value.get("url")):
+                clean[key] = {"url": value["url"]}
+        elif key == "title":
+            if value:
+                clean[key] = truncate(value, MAX_EMBED_TITLE)
+        elif key == "description":
+            if value:
+                clean[key] = truncate(value, MAX_EMBED_DESCRIPTION)
+        elif key in ("footer", "author") and not isinstance(value, dict):
+            continue
+        elif key == "footer":
+            text = truncate(value.get("text", ""), MAX_FOOTER_TEXT)
+            if text:
+                clean[key] = {"text": text}
+                if _is_url(value.get("icon_url")):
+                    clean[key]["icon_url"] = value["icon_url"]
+        elif key == "author":
+            name = truncate(value.get("name", ""), MAX_AUTHOR_NAME)
+            if name:
+                clean[key] = {"name": name}
+                for url_key in ("url", "icon_url"):
+                    if _is_url(value.get(url_key)):
+                        clean[key][url_key] = value[url_key]
+        elif key == "fields":
+            fields = [
+                {
+                    **field,
+                    "name": truncate(field.get("name", ""), MAX_FIELD_NAME),
+                    "value": truncate(field.get("value", ""), MAX_FIELD_VALUE),
+                }
+                for field in value[:MAX_EMBED_FIELDS]
+                if field.get("name") and field.get("value")
+            ]
+            if fields:
+                clean[key] = fields
+        else:
+            clean[key] = value
+    return clean
+
+
+def _fit_embed_total(embeds):
+    """
+    Shrinks descriptions (last embed first) and then drops trailing embeds
+    until the combined embed text fits within MAX_EMBED_TOTAL.
+    """
+    overflow = sum(_embed_length(e) for e in embeds) - MAX_EMBED_TOTAL
+    if overflow <= 0:
+        return embeds
+
+    for embed in reversed(embeds):
+        description = embed.get("description", "")
+        if not description:
+            continue
+        keep = max(len(description) - overflow, 0)
+        if keep > len(ELLIPSIS):
+            embed["description"] = truncate(description, keep)
+        else:
+            embed.pop("description")
+        overflow -= len(description) - len(embed.get("description", ""))
+        if overflow <= 0:
+            return embeds
+
+    while overflow > 0 and len(embeds) > 1:
+        overflow -= _embed_length(embeds.pop())
+
+    if overflow > 0 and embeds:
+        embed = embeds[0]
+        embed["title"] = truncate(
+            embed.get("title", ""), max(len(embed.get("title", "")) - overflow, 1)
+        )
+    return embeds
+
+
+def build_webhook_payload(
+    embeds, username=None, avatar_url=None, thread_name=None, content=None
+):
+    """
+    Builds a webhook payload that satisfies every Discord message limit.
+    """
+    embeds = [sanitize_embed(e) for e in embeds[:MAX_EMBEDS]]
+    embeds = [e for e in embeds if e]
+    embeds = _fit_embed_total(embeds)
+
+    payload = {"embeds": embeds}
+
+    username = truncate(str(username or "").strip(), MAX_USERNAME)
+    if any(word in username.lower() for word in FORBIDDEN_USERNAME_SUBSTRINGS):
+        username = DEFAULT_USERNAME
+    if username:
+        payload["username"] = username
+    if _is_url(avatar_url):
+        payload["avatar_url"] = avatar_url
+    if content:
+        payload["content"] = truncate(content, MAX_CONTENT)
+
+    if thread_name is not None:
+        # Thread names are single-line; fall back to a placeholder if empty
+        thread_name = " ".join(str(thread_name).split())
+        payload["thread_name"] = truncate(thread_name, MAX_THREAD_NAME) or "News Thread"
+
+    return payload
@@ -3,7 +3,18 @@ import json
 import os
 import logging
 import requests
+import threading
 import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from discord_payload import build_webhook_payload, strip_html
+from discord_routing import load_routing_table
+from story_clustering import (
+    STORY_CLUSTERING,
+    format_also_reported,
+    load_story_index,
+    save_story_index,
+)
 
 # Configure Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
@@ -15,24 +26,103 @@ discord_secret_arn = os.getenv("DISCORD_BOT_SECRET_ARN")
 REGION_NAME = "us-east-1"
 DISCORD_POST_TYPE = os.getenv("DISCORD_POST_TYPE", "forum")  # Default to 'forum'
 API_URL = "https://discord.com/api/v10"
-MAX_ACTIVE_THREADS = os.getenv("MAX_ACTIVE_THREADS", 200)
+MAX_ACTIVE_THREADS = int(os.getenv("MAX_ACTIVE_THREADS", 200))
+MAX_DELIVERY_WORKERS = int(os.getenv("MAX_DELIVERY_WORKERS", 8))
+MAX_RATE_LIMIT_RETRIES = 3
 
+# Routing table, loaded once per container
+_routing_table = None
 
-# Retrieve Discord Webhook URL from Secrets Manager
-def get_discord_secrets():
+
+# Retrieve the raw Discord secret from Secrets Manager
+def get_discord_secret():
     client = boto3.client("secretsmanager", region_name=REGION_NAME)
     try:
         response = client.get_secret_value(SecretId=discord_secret_arn)
-        secret = json.loads(response["SecretString"])
-        return (
-            secret.get("webhookUrl"),
-            secret.get("forumChannelId"),
-            secret.get("forumServerId"),
-            secret.get("token"),
-        )
+        return json.loads(response["SecretString"])
     except Exception as e:
-        logger.error(f"Error retrieving Discord Webhook URL: {str(e)}")
+        logger.error(f"Error retrieving Discord secret: {str(e)}")
+        return {}
+
+
+# Retrieve Discord Webhook URL from Secrets Manager
+def get_discord_secrets():
+    secret = get_discord_secret()
+    if not secret:
         return None
+    return (
+        secret.get("webhookUrl"),
+        secret.get("forumChannelId"),
+        secret.get("forumServerId"),
+        secret.get("token"),
+    )
+
+
+class RateLimitBucket:
+    """
+    Tracks Discord's rate-limit headers for one route (e.g. one webhook) and
+    waits before a request would exceed them. Each bucket owns its session.
+    """
+
+    def __init__(self):
+        self.session = requests.Session()
+        self.lock = threading.Lock()
+        self.remaining = None
+        self.reset_at = 0.0
+
+    def wait(self):
+        with self.lock:
+            delay = self.reset_at - time.monotonic()
+            exhausted = self.remaining is not None and self.remaining <= 0
+        if exhausted and delay > 0:
+            logger.debug(f"⏳ Rate limit bucket exhausted. Sleeping {delay:.2f}s")
+            time.sleep(delay)
+
+    def update(self, response):
+        headers = response.headers
+        with self.lock:
+            if "X-RateLimit-Remaining" in headers:
+                self.remaining = int(headers["X-RateLimit-Remaining"])
+            if "X-RateLimit-Reset-After" in headers:
+                self.reset_at = time.monotonic() + float(
+                    headers["X-RateLimit-Reset-After"]
+                )
+
+    def request(self, method, url, **kwargs):
+        """Sends a request, sleeping and retrying when Discord returns 429."""
+        for _ in range(MAX_RATE_LIMIT_RETRIES):
+            self.wait()
+            response = self.session.request(method, url, **kwargs)
+            self.update(response)
+            if response.status_code != 429:
+                return response
+
+            try:
+                retry_after = float(response.json().get("retry_after", 1))
+            except ValueError:
+                retry_after = float(response.headers.get("Retry-After", 1))
+            logger.warning(f"⚠️ Rate limited by Discord. Retrying in {retry_after}s")
+            time.sleep(retry_after)
+        return response
+
+
+# Load the destination routing table once per container
+def get_routing_table():
+    """
+    A table without destinations (e.g. the secret couldn't be read) isn't
+    cached, so a transient error only affects the current run.
+    """
+    global _routing_table
+    if _routing_table is not None:
+        return _routing_table
+
+    table = load_routing_table(get_discord_secret())
+    for destination in table.destinations.values():
+        destination["webhook_bucket"] = RateLimitBucket()
+        destination["api_bucket"] = RateLimitBucket()
+    if table.destinations:
+        _routing_table = table
+    return table
 
 
 # Format a professional Discord embed for Bluesky news posts
@@ -78,8 +168,26 @@ def format_bluesky_embed(post):
     return [embed]  # Return as a list
 
 
+# Format a Discord embed for RSS articles
+def format_rss_embed(post):
+    """
+    Generates an embed for an RSS article, converting its HTML summary to text.
+    """
+    embed = {
+        "title": strip_html(post.get("title", "")) or "News Update",
+        "description": strip_html(post.get("content", "")),
+        "url": post.get("post_url", post.get("url", "")),
+        "color": 3447003,
+    }
+    if post.get("author_name"):
+        embed["author"] = {"name": post["author_name"]}
+    if post.get("image_url"):
+        embed["image"] = {"url": post["image_url"]}
+    return [embed]
+
+
 # Fetch Active Threads
-def get_active_threads(forum_server_id, forum_channel_id, discord_token):
+def get_active_threads(forum_server_id, forum_channel_id, discord_token, bucket=None):
     """Fetches all active threads in the Discord forum."""
     url = f"{API_URL}/guilds/{forum_server_id}/threads/active"
 
@@ -89,7 +197,10 @@ def get_active_threads(forum_server_id, forum_channel_id, discord_token):
     }
 
     try:
-        response = requests.get(url, headers=headers)
+        if bucket:
+            response = bucket.request("get", url, headers=headers)
+        else:
+            response = requests.get(url, headers=headers)
         response.raise_for_status()  # Raise an error for HTTP failures
 
         data = response.json()
@@ -101,7 +212,7 @@ def get_active_threads(forum_server_id, forum_channel_id, discord_token):
                 thread
                 for thread in data.get("threads", [])
                 if str(thread.get("parent_id"))
-                == forum_channel_id  # Only archive threads from this forum
+                == str(forum_channel_id)  # Only archive threads from this forum
             ]
         else:
             logger.info("ℹ️ No active threads found.")
@@ -113,7 +224,7 @@ def get_active_threads(forum_server_id, forum_channel_id, discord_token):
         return []
 
 
-def archive_thread(discord_token, thread_id):
+def archive_thread(discord_token, thread_id, bucket=None):
     """Archives a thread by sending a PATCH request to Discord API."""
     url = f"https://discord.com/api/v10/channels/{thread_id}"
     payload = {"archived": True}
@@ -123,7 +234,10 @@ def archive_thread(discord_token, thread_id):
         "Content-Type": "application/json",
     }
 
-    response = requests.patch(url, json=payload, headers=headers)
+    if bucket:
+        response = bucket.request("patch", url, json=payload, headers=headers)
+    else:
+        response = requests.patch(url, json=payload, headers=headers)
 
     if response.status_code == 200:
         print(f"✅ Archived thread {thread_id}")
@@ -135,23 +249,35 @@ def archive_thread(discord_token, thread_id):
 
 
 # Archive Oldest Thread (if more than 200 are active)
-def archive_excess_threads(forum_channel_id, forum_server_id, discord_token):
-    """Archives the oldest thread if there are more than 200 active."""
+def archive_excess_threads(
+    forum_channel_id,
+    forum_server_id,
+    discord_token,
+    max_active_threads=MAX_ACTIVE_THREADS,
+    incoming=0,
+    bucket=None,
+):
+    """
+    Archives the oldest threads so that, after `incoming` new threads are
+    created, no more than `max_active_threads` are active.
+    """
 
     threads = get_active_threads(
         forum_channel_id=forum_channel_id,
         forum_server_id=forum_server_id,
         discord_token=discord_token,
+        bucket=bucket,
     )
 
-    if len(threads) <= MAX_ACTIVE_THREADS:
+    limit = max(max_active_threads - incoming, 0)
+    if len(threads) <= limit:
         print(
             f"✅ Only {len(threads)} active threads "
             f"in forum {forum_channel_id}. No need to archive."
         )
         return
 
-    excess_count = len(threads) - MAX_ACTIVE_THREADS
+    excess_count = len(threads) - limit
     print(
         f"⚠️ Found {len(threads)} active threads "
         f"in forum {forum_channel_id}. Archiving {excess_count} threads..."
@@ -161,58 +287,202 @@ def archive_excess_threads(forum_channel_id, forum_server_id, discord_token):
     threads_sorted = sorted(threads, key=lambda t: int(t["id"]))
 
     for thread in threads_sorted[:excess_count]:
-        archive_thread(discord_token=discord_token, thread_id=thread["id"])
-        time.sleep(1)  # Rate-limit to avoid hitting Discord API limits
-
+        archive_thread(
+            discord_token=discord_token, thread_id=thread["id"], bucket=bucket
+        )
+        if not bucket:
+            time.sleep(1)  # Rate-limit to avoid hitting Discord API limits
 
-# Post to Discord using Webhook
-def post_to_discord(post, source="bluesky"):
-    webhook_url, forum_channel_id, forum_server_id, discord_token = (
-        get_discord_secrets()
-    )
-    if not webhook_url:
-        logger.warning("Webhook URL not found. Aborting Discord post.")
-        return
 
-    # Only apply this formatting to Bluesky posts for now
+# Build the webhook payload for a post
+def build_post_payload(
+    post, source="bluesky", post_type=DISCORD_POST_TYPE, also_reported=()
+):
     if source == "bluesky":
         embeds = format_bluesky_embed(post)
     else:
-        embeds = [
-            {
-                "title": post.get("title", "News Update"),
-                "description": post.get("content", ""),
-                "url": post.get("url", ""),
-                "color": 3447003,
-            }
+        embeds = format_rss_embed(post)
+
+    if also_reported:
+        embeds[0]["fields"] = [
+            {"name": "Also reported by", "value": format_also_reported(also_reported)}
         ]
 
-    # Webhook Payload with Custom Name & Avatar
-    payload = {
-        "username": post.get("author_name", "News Bot"),  # Custom bot name
-        "avatar_url": post.get("author_avatar", ""),  # Custom avatar
-        "embeds": embeds,
-    }
+    thread_name = None
+    if post_type == "forum":
+        thread_name = post.get("title", post.get("author_name", "News Thread"))
+        if source != "bluesky":
+            thread_name = strip_html(thread_name)
+
+    # Webhook Payload with Custom Name & Avatar, clamped to Discord's limits
+    return build_webhook_payload(
+        embeds,
+        username=post.get("author_name") or "News Bot",
+        avatar_url=post.get("author_avatar", ""),
+        thread_name=thread_name,
+    )
 
-    # Handle Forum Posting
-    if DISCORD_POST_TYPE == "forum":
-        payload["thread_name"] = post.get(
-            "title", post.get("author_name", "News Thread")
+
+# Send a single post to one destination's webhook
+def send_post(destination, post, source="bluesky", also_reported=()):
+    """
+    Posts to the destination's webhook and returns the created message, or
+    None on failure. In forum mode the message's channel_id is the new thread.
+    """
+    payload = build_post_payload(post, source, destination["post_type"], also_reported)
+    try:
+        logger.debug(f"Sending payload to Discord ({destination['name']}): {payload}")
+        response = destination["webhook_bucket"].request(
+            "post", destination["webhook_url"], params={"wait": "true"}, json=payload
         )
-        # payload["content"] = post.get("title", "")
-        archive_excess_threads(
-            forum_channel_id=forum_channel_id,
-            forum_server_id=forum_server_id,
-            discord_token=discord_token,
+        response.raise_for_status()
+        logger.info(
+            f"✅ Successfully posted to Discord as {post.get('author_name')} "
+            f"(Destination: {destination['name']}, Type: {destination['post_type']})"
+        )
+        return response.json()
+    except (requests.RequestException, ValueError) as e:
+        logger.error(f"❌ Error posting to Discord ({destination['name']}): {str(e)}")
+        return None
+
+
+# Add "also reported by" follow-ups to an existing story thread
+def send_follow_ups(destination, story, posts):
+    if destination["post_type"] != "forum" or not story.get("thread_id"):
+        logger.info(
+            f"🔄 Skipping {len(posts)} near-duplicates of already posted story "
+            f"{story.get('title')!r} ({destination['name']})"
         )
+        return 0
 
+    payload = build_webhook_payload(
+        [],
+        username="News Bot",
+        content=f"📰 Also reported by:\n{format_also_reported(posts)}",
+    )
     try:
-        logger.debug(f"Sending payload to Discord: {payload}")
-        response = requests.post(webhook_url, json=payload)
+        response = destination["webhook_bucket"].request(
+            "post",
+            destination["webhook_url"],
+            params={"thread_id": story["thread_id"]},
+            json=payload,
+        )
         response.raise_for_status()
         logger.info(
-            f"✅ Successfully posted to Discord as "
-            f"{post.get('author_name')} (Type: {DISCORD_POST_TYPE})"
+            f"✅ Added {len(posts)} near-duplicates to thread {story['thread_id']}"
         )
+        return len(posts)
     except requests.RequestException as e:
-        logger.error(f"❌ Error posting to Discord: {str(e)}")
+        logger.error(f"❌ Error posting follow-up to Discord: {str(e)}")
+        return 0
+
+
+# Deliver a batch of posts to one destination, in order
+def deliver_to_destination(destination, posts, story_index=None):
+    """
+    Delivers posts to a destination. With a story index, near-duplicates are
+    collapsed into one thread per story instead of a thread per post.
+    """
+    if story_index is not None:
+        clusters = story_index.cluster(destination["name"], posts)
+    else:
+        clusters = [
+            {"post": p, "duplicates": [], "fingerprint": None, "story": None}
+            for p in posts
+        ]
+    new_clusters = [c for c in clusters if c["story"] is None]
+
+    if destination["post_type"] == "forum":
+        archive_excess_threads(
+            forum_channel_id=destination["forum_channel_id"],
+            forum_server_id=destination["forum_server_id"],
+            discord_token=destination["token"],
+            max_active_threads=destination["max_active_threads"],
+            incoming=len(new_clusters),
+            bucket=destination["api_bucket"],
+        )
+
+    posted = 0
+    for cluster in clusters:
+        post = cluster["post"]
+        if cluster["story"] is not None:
+            posted += send_follow_ups(
+                destination, cluster["story"], [post] + cluster["duplicates"]
+            )
+            continue
+
+        message = send_post(
+            destination, post, post.get("source", "bluesky"), cluster["duplicates"]
+        )
+        if message is None:
+            continue
+        posted += 1
+        if story_index is not None and cluster["fingerprint"] is not None:
+            thread_id = None
+            if destination["post_type"] == "forum":
+                thread_id = message.get("channel_id")
+            story_index.add(
+                destination["name"], post, cluster["fingerprint"], thread_id
+            )
+    return posted
+
+
+# Route posts to their destinations and deliver concurrently per destination
+def deliver_posts(posts):
+    """
+    Groups posts by destination and delivers each group on its own worker,
+    so a slow or rate-limited server doesn't hold up the others.
+    Returns the number of successful posts per destination.
+    """
+    table = get_routing_table()
+    batches = defaultdict(list)
+    unrouted = 0
+    for post in posts:
+        names = table.destinations_for(post)
+        unrouted += not names
+        for name in names:
+            batches[name].append(post)
+    if unrouted:
+        logger.warning(f"⚠️ {unrouted} posts had no valid Discord destination.")
+
+    if not batches:
+        logger.warning("No Discord destinations matched. Nothing to deliver.")
+        return {}
+
+    story_index = load_story_index() if STORY_CLUSTERING else None
+
+    results = {}
+    workers = min(MAX_DELIVERY_WORKERS, len(batches))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                deliver_to_destination, table.destinations[name], batch, story_index
+            ): name
+            for name, batch in batches.items()
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                logger.error(f"❌ Error delivering to destination {name}: {str(e)}")
+                results[name] = 0
+
+    if story_index is not None:
+        save_story_index(story_index)
+
+    logger.info(f"📢 Delivery results by destination: {results}")
+    return results
+
+
+# Post to Discord using Webhook
+def post_to_discord(post, source="bluesky"):
+    post = {**post, "source": source}
+    table = get_routing_table()
+    destinations = table.destinations_for(post)
+    if not destinations:
+        logger.warning("Webhook URL not found. Aborting Discord post.")
+        return
+
+    for name in destinations:
+        deliver_to_destination(table.destinations[name], [post])
@@ -0,0 +1,101 @@
+import logging
+import os
+
+logger = logging.getLogger()
+
+DEFAULT_DESTINATION = "default"
+WILDCARD = "*"
+DEFAULT_POST_TYPE = os.getenv("DISCORD_POST_TYPE", "forum")
+DEFAULT_MAX_ACTIVE_THREADS = int(os.getenv("MAX_ACTIVE_THREADS", 200))
+
+
+def build_destination(name, config):
+    """
+    Normalizes a destination entry from the Discord secret.
+    """
+    return {
+        "name": name,
+        "webhook_url": config.get("webhookUrl"),
+        "forum_channel_id": str(config.get("forumChannelId") or ""),
+        "forum_server_id": str(config.get("forumServerId") or ""),
+        "token": config.get("token"),
+        "post_type": config.get("postType", DEFAULT_POST_TYPE),
+        "max_active_threads": int(
+            config.get("maxActiveThreads", DEFAULT_MAX_ACTIVE_THREADS)
+        ),
+    }
+
+
+class RoutingTable:
+    """
+    Maps (source, feed) pairs to Discord destinations.
+
+    Routes are indexed once at load time so each lookup is a handful of dict
+    probes, from most to least specific:
+    (source, feed) -> (source, *) -> (*, feed) -> (*, *) -> default destination.
+
+    A route naming a destination that doesn't exist (or has no webhook) is
+    kept with only its valid destinations, so its posts are dropped rather
+    than falling through to another community's default server.
+    """
+
+    def __init__(self, destinations, routes=()):
+        self.destinations = destinations
+        self.index = {}
+
+        for route in routes:
+            names = route.get("destinations") or [route.get("destination")]
+            names = tuple(n for n in names if n)
+            unknown = [n for n in names if n not in destinations]
+            if unknown or not names:
+                logger.error(
+                    f"❌ Route has unknown or unconfigured destinations {unknown}. "
+                    f"Its posts won't be delivered there: {route}"
+                )
+                names = tuple(n for n in names if n in destinations)
+            key = (route.get("source", WILDCARD), route.get("feed", WILDCARD))
+            self.index[key] = self.index.get(key, ()) + names
+
+        self.fallback = (
+            (DEFAULT_DESTINATION,) if DEFAULT_DESTINATION in destinations else ()
+        )
+
+    def destinations_for(self, post):
+        """Returns the destination names a post should be delivered to."""
+        source = post.get("source", "bluesky")
+        feeds = [f for f in (post.get("feed_name"), post.get("feed_url")) if f]
+
+        candidates = [(source, feed) for feed in feeds] + [(source, WILDCARD)]
+        candidates += [(WILDCARD, feed) for feed in feeds] + [(WILDCARD, WILDCARD)]
+        for key in candidates:
+            if key in self.index:
+                return self.index[key]
+        return self.fallback
+
+
+def load_routing_table(secret):
+    """
+    Builds the routing table from the Discord secret.
+
+    The top-level webhookUrl/forumChannelId/forumServerId/token keys form the
+    "default" destination. Additional destinations live under "destinations"
+    and are selected by the "routes" list, e.g.
+    {"source": "rss", "feed": "https://example.com/feed", "destination": "tech"}.
+    """
+    destinations = {}
+    if secret.get("webhookUrl"):
+        destinations[DEFAULT_DESTINATION] = build_destination(
+            DEFAULT_DESTINATION, secret
+        )
+    for name, config in secret.get("destinations", {}).items():
+        if not config.get("webhookUrl"):
+            logger.warning(f"⚠️ Destination {name} has no webhookUrl. Skipping.")
+            continue
+        destinations[name] = build_destination(name, config)
+
+    table = RoutingTable(destinations, secret.get("routes", []))
+    logger.info(
+        f"📢 Loaded {len(destinations)} Discord destinations "
+        f"and {len(table.index)} routes."
+    )
+    return table
@@ -0,0 +1,166 @@
+import logging
+import os
+import threading
+import time
+from state_store import load_json, save_json
+
+logger = logging.getLogger()
+
+# Circuit Breaker Configuration
+FEED_HEALTH_KEY = "feed_health.json"
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 3))
+CIRCUIT_BASE_COOLDOWN = int(os.getenv("CIRCUIT_BASE_COOLDOWN", 600))  # Seconds
+CIRCUIT_MAX_COOLDOWN = int(os.getenv("CIRCUIT_MAX_COOLDOWN", 86400))  # Seconds
+EWMA_ALPHA = 0.2  # Weight of the newest sample in error rate / latency
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+STATE_ICONS = {CLOSED: "🟢", HALF_OPEN: "🟡", OPEN: "🔴"}
+
+
+def _new_record():
+    return {
+        "state": CLOSED,
+        "consecutive_failures": 0,
+        "trips": 0,  # Times opened in a row; drives the exponential cool-down
+        "open_until": 0,
+        "last_success": None,
+        "last_failure": None,
+        "last_error": None,
+        "error_rate": 0.0,
+        "latency_ms": None,
+    }
+
+
+def _ewma(previous, sample):
+    if previous is None:
+        return sample
+    return (1 - EWMA_ALPHA) * previous + EWMA_ALPHA * sample
+
+
+class FeedHealth:
+    """
+    Per-feed circuit breakers.
+
+    closed    -> the feed is fetched normally.
+    open      -> the feed failed CIRCUIT_FAILURE_THRESHOLD runs in a row and
+                 is skipped until its cool-down (doubling per trip) expires.
+    half_open -> the cool-down expired; the next fetch is a single probe
+                 that closes the circuit on success or reopens it on failure.
+    """
+
+    def __init__(self, records=None):
+        self.records = records or {}
+        self.lock = threading.Lock()
+
+    def _record(self, feed):
+        return self.records.setdefault(feed, _new_record())
+
+    def allow(self, feed, now=None):
+        """Returns True if the feed should be fetched this run."""
+        now = now or time.time()
+        with self.lock:
+            record = self._record(feed)
+            if record["state"] == OPEN:
+                if now < record["open_until"]:
+                    return False
+                record["state"] = HALF_OPEN
+                logger.info(f"🟡 Probing feed {feed} after cool-down.")
+            return True
+
+    def is_probe(self, feed):
+        with self.lock:
+            return self._record(feed)["state"] == HALF_OPEN
+
+    def record_success(self, feed, latency, now=None):
+        now = now or time.time()
+        with self.lock:
+            record = self._record(feed)
+            if record["state"] != CLOSED:
+                logger.info(f"🟢 Feed {feed} recovered. Closing circuit.")
+            record.update(
+                state=CLOSED,
+                consecutive_failures=0,
+                trips=0,
+                open_until=0,
+                last_success=now,
+                error_rate=_ewma(record["error_rate"], 0.0),
+                latency_ms=_ewma(record["latency_ms"], latency * 1000),
+            )
+
+    def record_failure(self, feed, error, latency, now=None):
+        now = now or time.time()
+        with self.lock:
+            record = self._record(feed)
+            record["consecutive_failures"] += 1
+            record.update(
+                last_failure=now,
+                last_error=str(error)[:200],
+                error_rate=_ewma(record["error_rate"], 1.0),
+                latency_ms=_ewma(record["latency_ms"], latency * 1000),
+            )
+            if (
+                record["state"] == HALF_OPEN
+                or record["consecutive_failures"] >= CIRCUIT_FAILURE_THRESHOLD
+            ):
+                cooldown = min(
+                    CIRCUIT_BASE_COOLDOWN * 2 ** record["trips"], CIRCUIT_MAX_COOLDOWN
+                )
+                record.update(state=OPEN, open_until=now + cooldown)
+                record["trips"] += 1
+                logger.warning(
+                    f"🔴 Opening circuit for feed {feed} for {cooldown}s: {error}"
+                )
+
+    def to_dict(self):
+        with self.lock:
+            return {"feeds": dict(self.records)}
+
+
+# Load feed health records from S3
+def load_feed_health():
+    data = load_json(FEED_HEALTH_KEY, {})
+    # Copy the records so the (read-only) cached document isn't mutated
+    return FeedHealth({k: dict(v) for k, v in data.get("feeds", {}).items()})
+
+
+# Save feed health records to S3
+def save_feed_health(health):
+    save_json(FEED_HEALTH_KEY, health.to_dict())
+
+
+def _ago(timestamp, now):
+    if not timestamp:
+        return "never"
+    seconds = int(now - timestamp)
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= size:
+            return f"{seconds // size}{unit} ago"
+    return f"{seconds}s ago"
+
+
+def format_status(health, now=None):
+    """Formats a one-line summary per feed, worst state first."""
+    now = now or time.time()
+    order = {OPEN: 0, HALF_OPEN: 1, CLOSED: 2}
+    lines = []
+    for feed, record in sorted(
+        health.records.items(), key=lambda item: (order[item[1]["state"]], item[0])
+    ):
+        latency = record["latency_ms"]
+        line = (
+            f"{STATE_ICONS[record['state']]} {feed} | "
+            f"last ok {_ago(record['last_success'], now)} | "
+            f"errors {record['error_rate']:.0%} | "
+            f"latency {f'{latency:.0f} ms' if latency is not None else 'n/a'}"
+        )
+        if record["state"] == OPEN:
+            line += f" | retry in {max(int(record['open_until'] - now), 0)}s"
+        lines.append(line)
+    return "\n".join(lines) or "No feed health data yet."
+
+
+if __name__ == "__main__":
+    print(format_status(load_feed_health()))
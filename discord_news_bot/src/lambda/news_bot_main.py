@@ -2,17 +2,32 @@ import boto3
 import json
 import os
 import logging
+import time
 import traceback
+from functools import lru_cache
 import nacl.signing
 import nacl.exceptions
-from sources.bluesky_client import fetch_bluesky_posts
-from discord_poster import post_to_discord
+from sources_registry import fetch_news_from_sources
+from discord_payload import MAX_CONTENT, truncate
+from discord_poster import deliver_posts
+from feed_health import format_status, load_feed_health
+from profiling import profiled
+from post_selection import select_posts
 
 # AWS Clients
 secrets_client = boto3.client("secretsmanager")
 
+# Discord Interaction Types
+PING = 1
+APPLICATION_COMMAND = 2
+EPHEMERAL = 64  # Message flag: only visible to the invoking user
+
 # Environment Variables
 discord_secret_arn = os.getenv("DISCORD_BOT_SECRET_ARN")
+SECRETS_CACHE_TTL = int(os.getenv("SECRETS_CACHE_TTL", 900))  # Seconds
+
+# Container-level cache of (fetched_at, secrets) reused by warm invocations
+_discord_secrets = (0, None)
 
 # Configure Logging
 logger = logging.getLogger()
@@ -34,14 +49,22 @@ def log_and_trace(level, message, error=None):
 
 def get_discord_secrets():
     """
-    Fetches Discord bot secrets from AWS Secrets Manager.
+    Fetches Discord bot secrets from AWS Secrets Manager, reusing the copy
+    from a warm container for up to SECRETS_CACHE_TTL seconds.
     """
+    global _discord_secrets
+    fetched_at, secrets = _discord_secrets
+    if secrets and time.time() - fetched_at < SECRETS_CACHE_TTL:
+        return secrets
+
     try:
         log_and_trace(logging.DEBUG, "Fetching Discord secrets")
         response = secrets_client.get_secret_value(SecretId=discord_secret_arn)
         log_and_trace(logging.DEBUG, f"Retrieved discord secrets: {response}")
         secret = json.loads(response["SecretString"])
-        return secret.get("token"), secret.get("appId"), secret.get("publicKey")
+        secrets = secret.get("token"), secret.get("appId"), secret.get("publicKey")
+        _discord_secrets = (time.time(), secrets)
+        return secrets
     except secrets_client.exceptions.ResourceNotFoundException:
         log_and_trace(
             logging.ERROR,
@@ -53,6 +76,14 @@ def get_discord_secrets():
         raise
 
 
+@lru_cache(maxsize=4)
+def get_verify_key(public_key):
+    """
+    Builds the signature verification key once per public key.
+    """
+    return nacl.signing.VerifyKey(public_key, encoder=nacl.encoding.HexEncoder)
+
+
 def verify_signature(event, public_key):
     """
     Verifies Discord request signature using the public key.
@@ -62,9 +93,7 @@ def verify_signature(event, public_key):
         timestamp = event["headers"].get("x-signature-timestamp", "")
         body = event.get("body", "")
 
-        verify_key = nacl.signing.VerifyKey(
-            public_key, encoder=nacl.encoding.HexEncoder
-        )
+        verify_key = get_verify_key(public_key)
         verify_key.verify(f"{timestamp}{body}".encode(), bytes.fromhex(signature))
         log_and_trace(logging.DEBUG, "Signature verification successful")
         return True
@@ -78,17 +107,15 @@ def verify_signature(event, public_key):
 
 def process_scheduled_event():
     """
-    Fetches Bluesky posts and posts them to Discord.
+    Fetches posts from all active sources and delivers them to the
+    Discord destinations they are routed to.
     """
     try:
-        log_and_trace(logging.INFO, "Fetching Bluesky posts...")
-        posts = fetch_bluesky_posts()
+        log_and_trace(logging.INFO, "Fetching news from active sources...")
+        posts = select_posts(fetch_news_from_sources())
 
-        for post in posts:
-            log_and_trace(
-                logging.DEBUG, f"Posting to Discord: {post.get('author_name')}"
-            )
-            post_to_discord(post, source="bluesky")
+        log_and_trace(logging.DEBUG, f"Delivering {len(posts)} posts to Discord")
+        deliver_posts(posts)
 
         log_and_trace(logging.INFO, "Successfully posted updates to Discord.")
         return {
@@ -96,10 +123,47 @@ def process_scheduled_event():
             "body": json.dumps("News Bot successfully posted updates to Discord."),
         }
     except Exception as e:
-        log_and_trace(logging.ERROR, "Error while fetching or posting Bluesky news", e)
+        log_and_trace(logging.ERROR, "Error while fetching or posting news", e)
         return {"statusCode": 500, "body": json.dumps(f"Error: {str(e)}")}
 
 
+def handle_interaction(event):
+    """
+    Verifies and answers a Discord interaction request.
+    Returns None if the request isn't a known interaction type.
+    """
+    TOKEN, APP_ID, PUBLIC_KEY = get_discord_secrets()
+
+    if not verify_signature(event, PUBLIC_KEY):
+        return {"statusCode": 401, "body": "Invalid request signature"}
+
+    body = json.loads(event["body"])
+    interaction_type = body.get("type")
+
+    if interaction_type == PING:  # Discord PING event
+        return {"statusCode": 200, "body": json.dumps({"type": 1})}
+
+    command = body.get("data", {}).get("name")
+    if interaction_type == APPLICATION_COMMAND and command == "feed-status":
+        return {
+            "statusCode": 200,
+            "body": json.dumps(
+                {
+                    "type": 4,  # CHANNEL_MESSAGE_WITH_SOURCE
+                    "data": {
+                        "content": truncate(
+                            format_status(load_feed_health()), MAX_CONTENT
+                        ),
+                        "flags": EPHEMERAL,
+                    },
+                }
+            ),
+        }
+
+    return None
+
+
+@profiled
 def lambda_handler(event, context):
     """
     Main Lambda handler.
@@ -117,16 +181,9 @@ def lambda_handler(event, context):
 
         # Handle Discord interactions
         if "headers" in event:
-            TOKEN, APP_ID, PUBLIC_KEY = get_discord_secrets()
-
-            if not verify_signature(event, PUBLIC_KEY):
-                return {"statusCode": 401, "body": "Invalid request signature"}
-
-            body = json.loads(event["body"])
-            interaction_type = body.get("type")
-
-            if interaction_type == 1:  # Discord PING event
-                return {"statusCode": 200, "body": json.dumps({"type": 1})}
+            response = handle_interaction(event)
+            if response:
+                return response
 
         log_and_trace(logging.WARNING, "Event did not match any known type.")
         return {"statusCode": 400, "body": "Unknown event type"}
@@ -0,0 +1,158 @@
+import heapq
+import logging
+import math
+import os
+import time
+from collections import defaultdict
+from datetime import datetime
+from state_store import load_json, save_json
+
+logger = logging.getLogger()
+
+# Selection Configuration (0 disables a limit)
+MAX_POSTS_PER_RUN = int(os.getenv("MAX_POSTS_PER_RUN", 20))
+MAX_POSTS_PER_HOUR = int(os.getenv("MAX_POSTS_PER_HOUR", 0))
+MAX_POSTS_PER_FEED = int(os.getenv("MAX_POSTS_PER_FEED", 0))  # 0 = fair share
+MAX_DEFERRED_POSTS = int(os.getenv("MAX_DEFERRED_POSTS", 200))
+MAX_DEFERRED_AGE_HOURS = float(os.getenv("MAX_DEFERRED_AGE_HOURS", 6))
+RECENCY_HALF_LIFE_HOURS = float(os.getenv("RECENCY_HALF_LIFE_HOURS", 2))
+SELECTION_STATE_KEY = "post_selection.json"
+
+# Relative weight of each engagement signal in the post dict
+ENGAGEMENT_WEIGHTS = {"likes": 1.0, "reposts": 2.0, "replies": 1.5, "quotes": 2.0}
+
+
+def post_timestamp(post, default):
+    """Returns the post's creation time as epoch seconds."""
+    created_at = post.get("created_at")
+    if not created_at:
+        return default
+    try:
+        return datetime.fromisoformat(created_at.replace("Z", "+00:00")).timestamp()
+    except (AttributeError, ValueError):
+        return default
+
+
+def score_post(post, now):
+    """
+    Scores a post by engagement, decayed by age. Posts without engagement
+    data (e.g. RSS) still rank by recency.
+    """
+    engagement = sum(
+        weight * (post.get(key) or 0) for key, weight in ENGAGEMENT_WEIGHTS.items()
+    )
+    age_hours = max(now - post_timestamp(post, now), 0) / 3600
+    return (1 + math.log1p(engagement)) * 0.5 ** (age_hours / RECENCY_HALF_LIFE_HOURS)
+
+
+def post_key(post):
+    """
+    Identifies the item itself, not the article it links to: two accounts
+    sharing the same URL are separate posts, and near-duplicate handling is
+    left to story clustering.
+    """
+    return post.get("bluesky_link") or post.get("post_url") or post.get("title")
+
+
+def feed_key(post):
+    return (
+        post.get("source", "bluesky"),
+        post.get("feed_name") or post.get("feed_url"),
+    )
+
+
+def rank_and_select(posts, budget, feed_quota=MAX_POSTS_PER_FEED, now=None):
+    """
+    Picks the top `budget` posts by score while keeping any one feed from
+    taking the whole budget.
+
+    Each feed first gets up to `feed_quota` of its best posts (or an equal
+    share of the budget when `feed_quota` is 0). An explicit quota is a hard
+    cap, even when the budget is 0 (unlimited) or not exceeded; a fair share
+    is not, so budget left unused by quiet feeds goes to the best remaining
+    posts. Returns (selected, held), both best-first.
+    """
+    now = now or time.time()
+    # Decorate once so the heaps compare floats, not post dicts
+    scored = [(score_post(p, now), i, p) for i, p in enumerate(posts)]
+    if not feed_quota and (not budget or len(scored) <= budget):
+        return [p for _, _, p in sorted(scored, reverse=True)], []
+
+    by_feed = defaultdict(list)
+    for entry in scored:
+        by_feed[feed_key(entry[2])].append(entry)
+    quota = feed_quota or math.ceil(budget / len(by_feed))
+
+    picked, rest = [], []
+    for entries in by_feed.values():
+        top = heapq.nlargest(quota, entries)
+        picked.extend(top)
+        chosen = {i for _, i, _ in top}
+        rest.extend(e for e in entries if e[1] not in chosen)
+
+    if budget and len(picked) > budget:
+        picked.sort(reverse=True)
+        rest.extend(picked[budget:])
+        picked = picked[:budget]
+    elif budget and not feed_quota:
+        chosen = {i for _, i, _ in heapq.nlargest(budget - len(picked), rest)}
+        picked.extend(e for e in rest if e[1] in chosen)
+        rest = [e for e in rest if e[1] not in chosen]
+
+    picked.sort(reverse=True)
+    rest.sort(reverse=True)
+    return [p for _, _, p in picked], [p for _, _, p in rest]
+
+
+# Select this run's posts, holding the rest for the next run
+def select_posts(posts):
+    """
+    Applies the per-run and per-hour posting budgets to freshly fetched posts
+    plus any held over from earlier runs. Posts that don't make the cut are
+    saved and retried next run until they are MAX_DEFERRED_AGE_HOURS old.
+    """
+    now = time.time()
+    state = load_json(SELECTION_STATE_KEY, {})
+    sent = [t for t in state.get("sent", []) if t > now - 3600]
+
+    candidates = {}
+    for post in state.get("deferred", []) + posts:
+        candidates.setdefault(post_key(post), post)
+    cutoff = now - MAX_DEFERRED_AGE_HOURS * 3600
+    fresh = [p for p in candidates.values() if p.get("deferred_at", now) >= cutoff]
+    if len(fresh) < len(candidates):
+        logger.info(f"🗑️ Dropped {len(candidates) - len(fresh)} stale deferred posts.")
+
+    budget = MAX_POSTS_PER_RUN
+    if MAX_POSTS_PER_HOUR:
+        remaining = max(MAX_POSTS_PER_HOUR - len(sent), 0)
+        budget = min(budget, remaining) if budget else remaining
+
+    if MAX_POSTS_PER_HOUR and budget == 0:
+        logger.info("⏳ Hourly posting budget used up.")
+        selected, held = [], rank_and_select(fresh, 0, feed_quota=0, now=now)[0]
+    else:
+        selected, held = rank_and_select(fresh, budget, now=now)
+
+    held = [{**p, "deferred_at": p.get("deferred_at", now)} for p in held]
+    if len(held) > MAX_DEFERRED_POSTS:
+        logger.info(
+            f"🗑️ Dropped {len(held) - MAX_DEFERRED_POSTS} deferred posts "
+            f"over the limit of {MAX_DEFERRED_POSTS}."
+        )
+        held = held[:MAX_DEFERRED_POSTS]
+    save_json(
+        SELECTION_STATE_KEY,
+        {
+            "deferred": held,
+            "sent": sent + [now] * len(selected),
+        },
+    )
+
+    if not budget and not MAX_POSTS_PER_HOUR:
+        budget = "unlimited"
+    logger.info(
+        f"📊 Selected {len(selected)} of {len(fresh)} posts "
+        f"(budget {budget}); holding {len(held)} for the next run."
+    )
+    return selected
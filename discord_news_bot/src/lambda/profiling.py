@@ -0,0 +1,262 @@
+import cProfile
+import functools
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+logger = logging.getLogger()
+
+# Profiling Configuration
+PROFILE_INVOCATIONS = os.getenv("PROFILE_INVOCATIONS", "false").lower() == "true"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/profiles")
+PROFILE_UPLOAD = os.getenv("PROFILE_UPLOAD", "true").lower() == "true"
+PROFILE_S3_PREFIX = "profiles/"
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", 40))
+TRACEMALLOC_FRAMES = 5
+
+
+def profiling_enabled(event):
+    """Profiling is on for every invocation via env, or per event flag."""
+    return PROFILE_INVOCATIONS or bool(isinstance(event, dict) and event.get("profile"))
+
+
+class HttpTimer:
+    """
+    Attributes wall-clock time to HTTP hosts by wrapping the transports used
+    here: urllib3 (requests, boto3), httpx (atproto) and urllib (feedparser).
+    Only the outermost call on a thread is timed, so retries and redirects
+    that re-enter the transport aren't double counted.
+    """
+
+    def __init__(self):
+        self.hosts = defaultdict(lambda: {"requests": 0, "seconds": 0.0})
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.patches = []
+
+    def _wrap(self, owner, name, host_of):
+        original = getattr(owner, name)
+        timer = self
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            if getattr(timer.local, "active", False):
+                return original(*args, **kwargs)
+            timer.local.active = True
+            started = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                timer.local.active = False
+                try:
+                    host = host_of(*args, **kwargs) or "unknown"
+                except Exception:
+                    host = "unknown"
+                with timer.lock:
+                    timer.hosts[host]["requests"] += 1
+                    timer.hosts[host]["seconds"] += elapsed
+
+        setattr(owner, name, timed)
+        self.patches.append((owner, name, original))
+
+    def __enter__(self):
+        try:
+            import urllib3.connectionpool
+
+            self._wrap(
+                urllib3.connectionpool.HTTPConnectionPool,
+                "urlopen",
+                lambda pool, *args, **kwargs: pool.host,
+            )
+        except ImportError:
+            pass
+        try:
+            import httpx
+
+            self._wrap(
+                httpx.Client,
+                "send",
+                lambda client, request, *args, **kwargs: request.url.host,
+            )
+        except ImportError:
+            pass
+
+        import urllib.request
+
+        self._wrap(
+            urllib.request.OpenerDirector,
+            "open",
+            lambda opener, url, *args, **kwargs: urlsplit(
+                url if isinstance(url, str) else url.full_url
+            ).hostname,
+        )
+        return self
+
+    def __exit__(self, *exc):
+        for owner, name, original in reversed(self.patches):
+            setattr(owner, name, original)
+        self.patches = []
+
+
+class ThreadProfilers:
+    """
+    cProfile only profiles the thread that enables it, so work handed to
+    worker threads (e.g. deliver_posts' executor) would be missing. While
+    active, every thread started gets its own profiler, merged in later.
+    """
+
+    def __init__(self):
+        self.profilers = []
+        self.previous = None
+
+    def _start(self, *args):
+        # Runs as the new thread's first profile callback; enabling the
+        # profiler replaces this hook for the rest of the thread
+        profiler = cProfile.Profile()
+        self.profilers.append(profiler)
+        profiler.enable()
+
+    def __enter__(self):
+        self.previous = threading.getprofile()
+        threading.setprofile(self._start)
+        return self
+
+    def __exit__(self, *exc):
+        threading.setprofile(self.previous)
+
+
+def _merge_stats(profiler, thread_profilers):
+    """Combines the handler thread's stats with every worker thread's."""
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    for worker in thread_profilers:
+        stats.add(worker)
+    return stats
+
+
+def _top_functions(stats, limit):
+    rows = []
+    for (filename, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append(
+            {
+                "function": f"{os.path.basename(filename)}:{line}({name})",
+                "calls": calls,
+                "tottime": round(tottime, 6),
+                "cumtime": round(cumtime, 6),
+            }
+        )
+    rows.sort(key=lambda r: r["cumtime"], reverse=True)
+    return rows[:limit]
+
+
+def _top_allocations(snapshot, limit):
+    snapshot = snapshot.filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        )
+    )
+    return [
+        {
+            "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "size_kb": round(stat.size / 1024, 1),
+            "count": stat.count,
+        }
+        for stat in snapshot.statistics("lineno")[:limit]
+    ]
+
+
+def write_artifacts(summary, stats, name):
+    """
+    Writes the JSON summary and raw pstats to PROFILE_DIR and, if enabled,
+    uploads both to the state bucket. Returns the local summary path.
+    """
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    summary_path = os.path.join(PROFILE_DIR, f"{name}.json")
+    stats_path = os.path.join(PROFILE_DIR, f"{name}.pstats")
+    with open(summary_path, "w") as f:
+        json.dump(summary, f, indent=1)
+    stats.dump_stats(stats_path)
+
+    if PROFILE_UPLOAD:
+        from state_store import S3_BUCKET, s3_client
+
+        try:
+            for path in (summary_path, stats_path):
+                key = PROFILE_S3_PREFIX + os.path.basename(path)
+                with open(path, "rb") as f:
+                    s3_client.put_object(Bucket=S3_BUCKET, Key=key, Body=f.read())
+            logger.info(f"📈 Uploaded profile to s3://{S3_BUCKET}/{PROFILE_S3_PREFIX}")
+        except Exception as e:
+            logger.error(f"Error uploading profile to S3: {e}")
+
+    return summary_path
+
+
+def profiled(handler):
+    """
+    Wraps a Lambda handler so that, when profiling is enabled, each
+    invocation records cProfile stats (across the handler and any threads it
+    starts), peak memory plus the allocations still alive when the handler
+    returns, and wall-clock time per HTTP host. Disabled invocations only pay
+    for the enabled check.
+    """
+
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        if not profiling_enabled(event):
+            return handler(event, context)
+
+        request_id = getattr(context, "aws_request_id", None) or "local"
+        name = f"{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}-{request_id}"
+
+        started_tracemalloc = not tracemalloc.is_tracing()
+        if started_tracemalloc:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+
+        with HttpTimer() as http, ThreadProfilers() as threads:
+            profiler.enable()
+            try:
+                return handler(event, context)
+            finally:
+                profiler.disable()
+                wall = time.perf_counter() - started
+                stats = _merge_stats(profiler, threads.profilers)
+                snapshot = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+                if started_tracemalloc:
+                    tracemalloc.stop()
+
+                summary = {
+                    "name": name,
+                    "wall_seconds": round(wall, 6),
+                    "peak_memory_kb": round(peak / 1024, 1),
+                    # Taken after the handler returns, so per-run objects that
+                    # were already freed don't show up here
+                    "allocations_scope": "alive at end of invocation",
+                    "threads_profiled": 1 + len(threads.profilers),
+                    "http": {
+                        host: {**v, "seconds": round(v["seconds"], 6)}
+                        for host, v in sorted(
+                            http.hosts.items(), key=lambda i: -i[1]["seconds"]
+                        )
+                    },
+                    "functions": _top_functions(stats, PROFILE_TOP_N),
+                    "allocations": _top_allocations(snapshot, PROFILE_TOP_N),
+                }
+                try:
+                    path = write_artifacts(summary, stats, name)
+                    logger.info(f"📈 Profile for this invocation written to {path}")
+                except Exception as e:
+                    logger.error(f"Error writing profile artifacts: {e}")
+
+    return wrapper
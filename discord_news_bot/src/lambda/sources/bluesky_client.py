@@ -4,6 +4,8 @@ import json
 import os
 import logging
 import time
+from feed_health import load_feed_health, save_feed_health
+from state_store import load_json, save_json
 
 # Configure Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
@@ -13,22 +15,35 @@ logger = logging.getLogger()
 # AWS Configuration
 bluesky_secret_arn = os.getenv("BLUESKY_SECRET_ARN")
 REGION_NAME = "us-east-1"
-S3_BUCKET = os.getenv("S3_BUCKET", "news-bot-processed-posts")
 S3_KEY = "processed_posts.json"
 MAX_RETRIES = 3
 FETCH_LIMIT = 10  # Adjust if needed
+FEED_METADATA_TTL = int(os.getenv("FEED_METADATA_TTL", 3600))  # Seconds
 
 # AWS Clients
 secrets_client = boto3.client("secretsmanager", region_name=REGION_NAME)
-s3_client = boto3.client("s3", region_name=REGION_NAME)
+
+# Container-level state reused across warm invocations
+_credentials = None
+_client = None
+_saved_feeds = (0, [])  # (fetched_at, feed URIs)
+_feed_metadata = {}  # feed URI -> (fetched_at, display name, creator handle)
 
 
 # Retrieve Bluesky Credentials from Secrets Manager
 def get_bluesky_credentials():
+    global _credentials
+    if _credentials and all(_credentials):
+        return _credentials
     try:
         response = secrets_client.get_secret_value(SecretId=bluesky_secret_arn)
         secret = json.loads(response["SecretString"])
-        return secret.get("username"), secret.get("password")
+        credentials = secret.get("username"), secret.get("password")
+        # Only cache complete credentials so a fixed secret is picked up
+        # without restarting the container
+        if all(credentials):
+            _credentials = credentials
+        return credentials
     except Exception as e:
         logger.error(f"Error retrieving Bluesky credentials: {e}")
         return None, None
@@ -36,26 +51,69 @@ def get_bluesky_credentials():
 
 # Load Processed Posts from S3
 def load_processed_posts():
-    try:
-        response = s3_client.get_object(Bucket=S3_BUCKET, Key=S3_KEY)
-        data = json.loads(response["Body"].read().decode("utf-8"))
-        return set(data.get("processed_posts", []))
-    except s3_client.exceptions.NoSuchKey:
-        logger.warning("Processed posts file not found. Starting fresh.")
-        return set()
-    except Exception as e:
-        logger.error(f"Error loading processed posts from S3: {e}")
-        return set()
+    data = load_json(S3_KEY, {})
+    return set(data.get("processed_posts", []))
 
 
 # Save Processed Posts to S3
 def save_processed_posts(processed_posts):
-    try:
-        data = json.dumps({"processed_posts": list(processed_posts)})
-        s3_client.put_object(Bucket=S3_BUCKET, Key=S3_KEY, Body=data)
-        logger.debug("Successfully saved processed posts to S3.")
-    except Exception as e:
-        logger.error(f"Error saving processed posts to S3: {e}")
+    save_json(S3_KEY, {"processed_posts": list(processed_posts)})
+
+
+# Reuse the logged-in client from a warm container
+def get_client(username, password):
+    """
+    Returns a logged-in Bluesky client. The client refreshes its own session
+    tokens, so warm invocations skip the login round trip.
+    """
+    global _client
+    if _client is None:
+        client = Client()
+        logger.debug("Authenticating with Bluesky API...")
+        client.login(username, password)
+        logger.info("✅ Successfully authenticated with Bluesky.")
+        _client = client
+    return _client
+
+
+def reset_client():
+    global _client
+    _client = None
+
+
+# Saved feed URIs from the user's preferences, cached per container
+def get_saved_feeds(client):
+    global _saved_feeds
+    fetched_at, saved_feeds = _saved_feeds
+    if saved_feeds and time.time() - fetched_at < FEED_METADATA_TTL:
+        return saved_feeds
+
+    logger.debug("Fetching user preferences...")
+    prefs = client.app.bsky.actor.get_preferences()
+
+    logger.debug("Identifying saved feeds...")
+    saved_feeds = []
+    for pref in prefs.preferences:
+        if pref.py_type == "app.bsky.actor.defs#savedFeedsPrefV2":
+            for item in pref.items:
+                if item.type == "feed":
+                    saved_feeds.append(item.value)
+
+    _saved_feeds = (time.time(), saved_feeds)
+    return saved_feeds
+
+
+# Feed display name and creator, cached per container
+def get_feed_metadata(client, feed_uri):
+    cached = _feed_metadata.get(feed_uri)
+    if cached and time.time() - cached[0] < FEED_METADATA_TTL:
+        return cached[1], cached[2]
+
+    feed_data = client.app.bsky.feed.get_feed_generator({"feed": feed_uri})
+    feed_name = feed_data.view.display_name
+    feed_creator = feed_data.view.creator.handle
+    _feed_metadata[feed_uri] = (time.time(), feed_name, feed_creator)
+    return feed_name, feed_creator
 
 
 # Extracts the post URL, prioritizing external embeds
@@ -77,24 +135,12 @@ def fetch_bluesky_posts():
         return []
 
     processed_posts = load_processed_posts()
+    health = load_feed_health()
     new_posts = []
 
-    client = Client()
     try:
-        logger.debug("Authenticating with Bluesky API...")
-        client.login(username, password)
-        logger.info("✅ Successfully authenticated with Bluesky.")
-
-        logger.debug("Fetching user preferences...")
-        prefs = client.app.bsky.actor.get_preferences()
-
-        logger.debug("Identifying saved feeds...")
-        saved_feeds = []
-        for pref in prefs.preferences:
-            if pref.py_type == "app.bsky.actor.defs#savedFeedsPrefV2":
-                for item in pref.items:
-                    if item.type == "feed":
-                        saved_feeds.append(item.value)
+        client = get_client(username, password)
+        saved_feeds = get_saved_feeds(client)
 
         if not saved_feeds:
             logger.warning("⚠️ No saved feeds found.")
@@ -105,18 +151,22 @@ def fetch_bluesky_posts():
         total_new_post_cnt = 0
 
         for feed_uri in saved_feeds:
-            for attempt in range(1, MAX_RETRIES + 1):
+            health_key = f"bluesky:{feed_uri}"
+            if not health.allow(health_key):
+                logger.info(f"⏭️ Skipping feed {feed_uri}: circuit open.")
+                continue
+
+            # A half-open probe gets a single attempt
+            attempts = 1 if health.is_probe(health_key) else MAX_RETRIES
+            for attempt in range(1, attempts + 1):
+                started = time.monotonic()
                 try:
                     logger.info(
                         f"🔍 Attempt {attempt}: Fetching posts from feed {feed_uri}..."
                     )
 
                     # ✅ Get Feed Details
-                    feed_data = client.app.bsky.feed.get_feed_generator(
-                        {"feed": feed_uri}
-                    )
-                    feed_name = feed_data.view.display_name
-                    feed_creator = feed_data.view.creator.handle
+                    feed_name, feed_creator = get_feed_metadata(client, feed_uri)
                     logger.info(f"📢 Processing feed: {feed_name} by {feed_creator}")
 
                     # ✅ Get Posts from Feed
@@ -127,6 +177,7 @@ def fetch_bluesky_posts():
 
                     if not feed_posts:
                         logger.warning(f"⚠️ No posts found in feed {feed_uri}.")
+                        health.record_success(health_key, time.monotonic() - started)
                         break
 
                     logger.info(
@@ -171,6 +222,9 @@ def fetch_bluesky_posts():
                             "replies": item.post.reply_count or 0,
                             "quotes": item.post.quote_count or 0,
                             "feed_name": feed_name,
+                            "source": "bluesky",
+                            "created_at": getattr(record, "created_at", None)
+                            or item.post.indexed_at,
                         }
 
                         logger.info(f"✅ Processed Post: {post}")
@@ -179,14 +233,19 @@ def fetch_bluesky_posts():
                         processed_posts.add(post_id)
 
                     logger.info(f"📢 Feed: {feed_name} processed")
+                    health.record_success(health_key, time.monotonic() - started)
 
                     break  # Break out of retry loop on success
 
                 except Exception as e:
                     logger.error(f"⚠️ Error fetching feed {feed_uri}: {e}")
-                    time.sleep(2)  # Retry delay
+                    if attempt == attempts:
+                        health.record_failure(health_key, e, time.monotonic() - started)
+                    else:
+                        time.sleep(2)  # Retry delay
 
         save_processed_posts(processed_posts)
+        save_feed_health(health)
 
         logger.info(
             f"✅ Total new posts retrieved across all feeds: {total_new_post_cnt}"
@@ -195,6 +254,7 @@ def fetch_bluesky_posts():
         return new_posts
 
     except Exception as e:
+        reset_client()  # Log in again next run in case the session went bad
         logger.error(f"❌ Critical error fetching posts from Bluesky: {e}")
         return []
 
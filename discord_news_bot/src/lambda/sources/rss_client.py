@@ -1,6 +1,36 @@
+import calendar
 import feedparser
 import logging
 import os
+import time
+from datetime import datetime, timezone
+from feed_health import load_feed_health, save_feed_health
+from sources.bluesky_client import load_processed_posts, save_processed_posts
+
+# HTTP validators (ETag / Last-Modified) per feed, reused by warm invocations
+_feed_validators = {}
+
+
+def entry_timestamp(entry):
+    """
+    Returns the entry's published (or updated) time as an ISO-8601 string.
+    """
+    parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+    if not parsed:
+        return None
+    return datetime.fromtimestamp(calendar.timegm(parsed), timezone.utc).isoformat()
+
+
+def raise_for_feed_error(feed):
+    """
+    feedparser reports network and HTTP failures on the result instead of
+    raising; turn them into exceptions so the feed's circuit breaker sees them.
+    """
+    status = feed.get("status")
+    if status and status >= 400:
+        raise IOError(f"HTTP {status}")
+    if feed.get("bozo") and not feed.entries and status != 304:
+        raise IOError(f"Unreadable feed: {feed.get('bozo_exception')}")
 
 
 def fetch_rss_posts():
@@ -15,22 +45,64 @@ def fetch_rss_posts():
         logger.warning("No RSS feeds configured. Skipping RSS fetch.")
         return []
 
+    processed_posts = load_processed_posts()
+    health = load_feed_health()
     articles = []
-    for feed_url in RSS_FEEDS:
+    for feed_url in (url.strip() for url in RSS_FEEDS if url.strip()):
+        health_key = f"rss:{feed_url}"
+        if not health.allow(health_key):
+            logger.info(f"Skipping RSS feed {feed_url}: circuit open.")
+            continue
+
         logger.info(f"Fetching RSS feed: {feed_url}")
+        started = time.monotonic()
         try:
-            feed = feedparser.parse(feed_url)
+            etag, modified = _feed_validators.get(feed_url, (None, None))
+            feed = feedparser.parse(feed_url, etag=etag, modified=modified)
+            raise_for_feed_error(feed)
+            latency = time.monotonic() - started
+            if feed.get("status") == 304:
+                logger.info(f"RSS feed unchanged since last fetch: {feed_url}")
+                health.record_success(health_key, latency)
+                continue
             for entry in feed.entries[:5]:  # Limit to 5 latest articles per feed
-                article = {
-                    "title": entry.title,
-                    "content": entry.summary,
-                    "author_name": entry.get("author", "Unknown Author"),
-                    "post_url": entry.link,
-                    "image_url": entry.get("media_content", [{}])[0].get("url", ""),
-                    "source": "rss",
-                }
+                # A malformed entry is skipped; it says nothing about feed health
+                link = entry.get("link")
+                if not link:
+                    logger.warning(f"Skipping RSS entry without a link in {feed_url}")
+                    continue
+                if link in processed_posts:
+                    logger.debug(f"Skipping already processed article: {link}")
+                    continue
+                try:
+                    article = {
+                        "title": entry.get("title") or link,
+                        "content": entry.get("summary", ""),
+                        "author_name": entry.get("author", "Unknown Author"),
+                        "post_url": link,
+                        "image_url": (entry.get("media_content") or [{}])[0].get(
+                            "url", ""
+                        ),
+                        "source": "rss",
+                        "feed_url": feed_url,
+                        "feed_name": feed.feed.get("title", feed_url),
+                        "created_at": entry_timestamp(entry),
+                    }
+                except Exception as e:
+                    logger.warning(f"Skipping malformed RSS entry {link}: {e}")
+                    continue
                 articles.append(article)
+                processed_posts.add(link)
+            # Only remember validators once the entries have been processed, so
+            # a failed run refetches the feed instead of getting a 304
+            _feed_validators[feed_url] = (feed.get("etag"), feed.get("modified"))
+            health.record_success(health_key, latency)
         except Exception as e:
             logger.error(f"Error fetching RSS feed {feed_url}: {e}")
+            health.record_failure(health_key, e, time.monotonic() - started)
+
+    if articles:
+        save_processed_posts(processed_posts)
+    save_feed_health(health)
 
     return articles
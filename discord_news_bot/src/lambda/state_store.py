@@ -0,0 +1,133 @@
+import boto3
+import json
+import os
+import logging
+import threading
+from botocore.exceptions import ClientError
+
+# Configure Logging
+logger = logging.getLogger()
+
+# AWS Configuration
+REGION_NAME = "us-east-1"
+S3_BUCKET = os.getenv("S3_BUCKET", "news-bot-processed-posts")
+
+# AWS Clients
+s3_client = boto3.client("s3", region_name=REGION_NAME)
+
+# Container-level cache of state documents: key -> (ETag, parsed document).
+# Survives across warm Lambda invocations, so unchanged state is never
+# downloaded or parsed twice.
+_cache = {}
+_cache_lock = threading.Lock()
+
+# Write-behind mode (long-running daemon): the in-memory copy is
+# authoritative, saves only mark documents dirty and flush() snapshots them.
+_write_behind = False
+_dirty = set()
+
+
+def _is_not_modified(error):
+    return error.response.get("ResponseMetadata", {}).get(
+        "HTTPStatusCode"
+    ) == 304 or error.response.get("Error", {}).get("Code") in ("304", "NotModified")
+
+
+# Load a JSON state document from S3
+def load_json(key, default=None):
+    """
+    Loads a JSON document from the state bucket, returning `default` if it
+    doesn't exist yet or can't be read.
+
+    Documents are cached per container. When a cached copy exists the GET is
+    conditional on its ETag, so S3 only sends the body if another writer has
+    changed it since. Treat the returned document as read-only; callers save
+    changes with save_json, which refreshes the cache.
+    """
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached and _write_behind:
+        return cached[1]
+
+    try:
+        if cached:
+            response = s3_client.get_object(
+                Bucket=S3_BUCKET, Key=key, IfNoneMatch=cached[0]
+            )
+        else:
+            response = s3_client.get_object(Bucket=S3_BUCKET, Key=key)
+        data = json.loads(response["Body"].read().decode("utf-8"))
+        with _cache_lock:
+            _cache[key] = (response["ETag"], data)
+        return data
+    except ClientError as e:
+        if cached and _is_not_modified(e):
+            logger.debug(f"♻️ {key} unchanged since last load. Reusing cached copy.")
+            return cached[1]
+        if e.response.get("Error", {}).get("Code") == "NoSuchKey":
+            logger.warning(f"State file {key} not found. Starting fresh.")
+        else:
+            logger.error(f"Error loading {key} from S3: {e}")
+    except Exception as e:
+        logger.error(f"Error loading {key} from S3: {e}")
+    return default
+
+
+# Save a JSON state document to S3
+def save_json(key, data):
+    if _write_behind:
+        with _cache_lock:
+            etag = _cache.get(key, (None, None))[0]
+            _cache[key] = (etag, data)
+            _dirty.add(key)
+        return
+
+    try:
+        response = s3_client.put_object(
+            Bucket=S3_BUCKET, Key=key, Body=json.dumps(data)
+        )
+        with _cache_lock:
+            _cache[key] = (response["ETag"], data)
+        logger.debug(f"Successfully saved {key} to S3.")
+    except Exception as e:
+        with _cache_lock:
+            _cache.pop(key, None)
+        logger.error(f"Error saving {key} to S3: {e}")
+
+
+def enable_write_behind():
+    """
+    Keeps state in memory and defers S3 writes to flush(). Only safe when
+    this process is the sole writer, as in the long-running daemon.
+    """
+    global _write_behind
+    _write_behind = True
+
+
+def flush():
+    """Writes every document changed since the last flush to S3."""
+    with _cache_lock:
+        pending = {key: _cache[key][1] for key in _dirty}
+        _dirty.clear()
+
+    for key, data in pending.items():
+        try:
+            response = s3_client.put_object(
+                Bucket=S3_BUCKET, Key=key, Body=json.dumps(data)
+            )
+            with _cache_lock:
+                if _cache.get(key, (None, None))[1] is data:
+                    _cache[key] = (response["ETag"], data)
+        except Exception as e:
+            with _cache_lock:
+                _dirty.add(key)  # Retry on the next flush
+            logger.error(f"Error saving {key} to S3: {e}")
+    if pending:
+        logger.debug(f"Snapshotted {len(pending)} state documents to S3.")
+    return len(pending)
+
+
+def clear_cache():
+    """Drops all cached state documents, forcing the next loads to hit S3."""
+    with _cache_lock:
+        _cache.clear()
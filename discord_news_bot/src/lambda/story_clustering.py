@@ -0,0 +1,252 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from discord_payload import MAX_FIELD_VALUE, strip_html
+from state_store import load_json, save_json
+
+logger = logging.getLogger()
+
+# Clustering Configuration
+STORY_CLUSTERING = os.getenv("STORY_CLUSTERING", "true").lower() == "true"
+STORY_INDEX_KEY = "story_index.json"
+STORY_MAX_DISTANCE = int(os.getenv("STORY_MAX_DISTANCE", 12))  # Hamming bits
+STORY_INDEX_TTL_HOURS = int(os.getenv("STORY_INDEX_TTL_HOURS", 24))
+STORY_INDEX_MAX_SIZE = int(os.getenv("STORY_INDEX_MAX_SIZE", 2000))
+FINGERPRINT_BITS = 64
+NUMBER_WEIGHT = 2  # Vote tallies, magnitudes, amounts etc. pin down a story
+
+_URL_RE = re.compile(r"https?://\S+")
+_WORD_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "this to was were will with after over says said new "
+    # Units some outlets write as symbols ("12%", "$4 billion"), which are dropped
+    "percent pct dollar dollars euro euros".split()
+)
+_SIBILANT_ENDINGS = ("ss", "sh", "ch", "x", "z")
+
+
+def _stem(word):
+    """
+    Light suffix stripping so inflections of a word share a feature
+    ("passes"/"passed"/"passing" -> "pass", "killed"/"kills" -> "kill").
+    """
+    if len(word) <= 3 or word[0].isdigit():
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith("es") and word[:-2].endswith(_SIBILANT_ENDINGS):
+        return word[:-2]
+    for suffix in ("ing", "ed", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            if suffix == "s" and word.endswith("ss"):
+                return word
+            return word[: -len(suffix)]
+    return word
+
+
+def _features(text):
+    """
+    Splits text into the words that feed the SimHash. Short texts like
+    headlines are too noisy for shingles, so features are single stemmed
+    words.
+    """
+    return [
+        _stem(w)
+        for w in _WORD_RE.findall(_URL_RE.sub(" ", text.lower()))
+        if len(w) > 1 and w not in STOP_WORDS
+    ]
+
+
+def story_text(post):
+    """Returns the text a post is fingerprinted on (title + content)."""
+    title = post.get("title", "")
+    content = post.get("content", "")
+    if post.get("source") == "rss":
+        title, content = strip_html(title), strip_html(content)
+    if title.endswith("...") and content.startswith(title[:-3]):
+        title = ""  # Bluesky titles are a prefix of the content
+    return f"{title} {content}"
+
+
+def fingerprint_batch(texts):
+    """
+    Computes 64-bit SimHash fingerprints for a batch of texts.
+
+    Feature hashes are memoized across the batch, so words shared between
+    stories (which is most of them, for near-duplicates) are hashed once.
+    Numbers count NUMBER_WEIGHT times. Texts without any usable words get a
+    fingerprint of None.
+    """
+    feature_bits = {}
+    fingerprints = []
+    for text in texts:
+        counts = [0] * FINGERPRINT_BITS
+        features = _features(text)
+        for feature in features:
+            bits = feature_bits.get(feature)
+            if bits is None:
+                digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+                value = int.from_bytes(digest, "big")
+                weight = NUMBER_WEIGHT if feature[0].isdigit() else 1
+                bits = [
+                    weight if value >> i & 1 else -weight
+                    for i in range(FINGERPRINT_BITS)
+                ]
+                feature_bits[feature] = bits
+            counts = [c + b for c, b in zip(counts, bits)]
+
+        if not features:
+            fingerprints.append(None)
+            continue
+        fingerprints.append(sum(1 << i for i, c in enumerate(counts) if c > 0))
+    return fingerprints
+
+
+def hamming_distance(a, b):
+    return (a ^ b).bit_count()
+
+
+def format_also_reported(posts):
+    """Formats an "Also reported by" embed field value within Discord's limits."""
+    lines = []
+    length = 0
+    for post in posts:
+        name = post.get("author_name") or post.get("feed_name") or "Unknown"
+        url = post.get("post_url") or post.get("bluesky_link")
+        line = f"[{name}]({url})" if url else name
+        if length + len(line) + 1 > MAX_FIELD_VALUE:
+            break
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+
+class StoryIndex:
+    """
+    Rolling index of recently posted stories, keyed by destination.
+
+    Fingerprints are split into STORY_MAX_DISTANCE + 1 bands; by the
+    pigeonhole principle two fingerprints within STORY_MAX_DISTANCE bits
+    share at least one identical band, so only stories in a matching band
+    bucket have to be compared.
+    """
+
+    def __init__(self, stories=(), max_distance=STORY_MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.band_count = max_distance + 1
+        self.band_width = FINGERPRINT_BITS // self.band_count
+        self.lock = threading.Lock()
+        self.stories = []
+        self.buckets = {}
+        for story in stories:
+            self._add(story)
+
+    def _bands(self, fingerprint):
+        mask = (1 << self.band_width) - 1
+        return [
+            (i, fingerprint >> (i * self.band_width) & mask)
+            for i in range(self.band_count)
+        ]
+
+    def _add(self, story):
+        self.stories.append(story)
+        for band in self._bands(story["fingerprint"]):
+            self.buckets.setdefault((story["destination"], *band), []).append(story)
+
+    def find(self, destination, fingerprint):
+        """Returns the closest indexed story within max_distance, if any."""
+        best, best_distance = None, self.max_distance + 1
+        for band in self._bands(fingerprint):
+            for story in self.buckets.get((destination, *band), ()):
+                distance = hamming_distance(story["fingerprint"], fingerprint)
+                if distance < best_distance:
+                    best, best_distance = story, distance
+        return best
+
+    def add(self, destination, post, fingerprint, thread_id=None):
+        story = {
+            "destination": destination,
+            "fingerprint": fingerprint,
+            "thread_id": thread_id,
+            "title": post.get("title", "")[:100],
+            "url": post.get("post_url", ""),
+            "posted_at": time.time(),
+        }
+        with self.lock:
+            self._add(story)
+        return story
+
+    def cluster(self, destination, posts):
+        """
+        Groups a destination's posts into stories.
+
+        Returns a list of clusters in post order, each with the canonical
+        "post", its near-duplicate "duplicates" and its "fingerprint". When
+        the post matches a previously posted story, "story" is that indexed
+        story and the post and its duplicates are all follow-ups to it.
+        """
+        clusters = []
+        pending = StoryIndex(max_distance=self.max_distance)
+        fingerprints = fingerprint_batch([story_text(p) for p in posts])
+
+        for post, fingerprint in zip(posts, fingerprints):
+            cluster = {
+                "post": post,
+                "duplicates": [],
+                "fingerprint": fingerprint,
+                "story": None,
+            }
+            if fingerprint is None:
+                clusters.append(cluster)
+                continue
+
+            match = pending.find(destination, fingerprint)
+            if match is not None:
+                match["cluster"]["duplicates"].append(post)
+                continue
+
+            with self.lock:
+                cluster["story"] = self.find(destination, fingerprint)
+            pending.add(destination, post, fingerprint)["cluster"] = cluster
+            clusters.append(cluster)
+
+        collapsed = len(posts) - sum(c["story"] is None for c in clusters)
+        if collapsed:
+            logger.info(
+                f"🧩 Collapsed {collapsed} near-duplicate posts for {destination}."
+            )
+        return clusters
+
+    def to_dict(self, ttl_hours=STORY_INDEX_TTL_HOURS, max_size=STORY_INDEX_MAX_SIZE):
+        cutoff = time.time() - ttl_hours * 3600
+        with self.lock:
+            stories = [s for s in self.stories if s["posted_at"] >= cutoff]
+        stories = stories[-max_size:]
+        return {
+            "stories": [
+                {**s, "fingerprint": format(s["fingerprint"], "016x")} for s in stories
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        cutoff = time.time() - STORY_INDEX_TTL_HOURS * 3600
+        return cls(
+            {**s, "fingerprint": int(s["fingerprint"], 16)}
+            for s in data.get("stories", [])
+            if s.get("posted_at", 0) >= cutoff
+        )
+
+
+# Load the rolling story index from S3
+def load_story_index():
+    return StoryIndex.from_dict(load_json(STORY_INDEX_KEY, {}))
+
+
+# Save the rolling story index to S3
+def save_story_index(index):
+    save_json(STORY_INDEX_KEY, index.to_dict())
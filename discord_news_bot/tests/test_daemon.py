@@ -0,0 +1,92 @@
+import asyncio
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+# Add the `src/lambda` directory to sys.path so imports work
+sys.path.append(
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "../src/lambda"))
+)
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+import daemon  # noqa: E402
+
+
+async def http_request(port, method, path, body=""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"X-Signature-Ed25519: abc\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n{body}".encode()
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.decode().partition("\r\n\r\n")
+    return int(head.split()[1]), payload
+
+
+class TestDaemon(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.server = await asyncio.start_server(
+            daemon.handle_connection, "127.0.0.1", 0
+        )
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    @patch("daemon.handle_interaction")
+    async def test_interaction_endpoint(self, mock_interaction):
+        """Test interactions are passed to the shared handler with headers."""
+        mock_interaction.return_value = {
+            "statusCode": 200,
+            "body": json.dumps({"type": 1}),
+        }
+        status, body = await http_request(
+            self.port, "POST", "/news-bot", json.dumps({"type": 1})
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body), {"type": 1})
+        event = mock_interaction.call_args[0][0]
+        self.assertEqual(event["headers"]["x-signature-ed25519"], "abc")
+        self.assertEqual(event["body"], json.dumps({"type": 1}))
+
+    async def test_health_and_unknown_paths(self):
+        """Test the health check and 404 for other paths."""
+        self.assertEqual((await http_request(self.port, "GET", "/health"))[0], 200)
+        self.assertEqual((await http_request(self.port, "GET", "/nope"))[0], 404)
+
+    @patch("daemon.handle_interaction", side_effect=TypeError("no secrets"))
+    async def test_interaction_error_returns_500(self, _mock_interaction):
+        """Test a failing handler still gets an HTTP response, like Lambda's."""
+        status, _ = await http_request(self.port, "POST", "/news-bot", "{}")
+        self.assertEqual(status, 500)
+
+    @patch("daemon.REQUEST_TIMEOUT_SECONDS", 0.05)
+    async def test_idle_client_times_out(self):
+        """Test connections that never send a request are closed."""
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        response = await asyncio.wait_for(reader.read(), timeout=1)
+        writer.close()
+        self.assertTrue(response.startswith(b"HTTP/1.1 408"))
+
+    @patch("daemon.POLL_INTERVAL_SECONDS", 0.01)
+    @patch("daemon.process_scheduled_event", return_value={"statusCode": 200})
+    async def test_poll_loop_runs_until_stopped(self, mock_process):
+        """Test the scheduler keeps polling and exits when stopped."""
+        stop = asyncio.Event()
+        task = asyncio.create_task(daemon.poll_loop(stop))
+        await asyncio.sleep(0.1)
+        stop.set()
+        await asyncio.wait_for(task, timeout=1)
+        self.assertTrue(mock_process.call_count >= 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import sys
+import unittest
+
+# Add the `src/lambda` directory to sys.path so imports work
+sys.path.append(
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "../src/lambda"))
+)
+
+from discord_payload import (  # noqa: E402
+    MAX_EMBED_DESCRIPTION,
+    MAX_EMBED_TITLE,
+    MAX_EMBED_TOTAL,
+    MAX_THREAD_NAME,
+    build_webhook_payload,
+    strip_html,
+    truncate,
+)
+
+
+class TestDiscordPayload(unittest.TestCase):
+
+    def test_strip_html(self):
+        """Test that RSS HTML summaries are reduced to plain text."""
+        text = strip_html("<p>Breaking &amp; <b>important</b></p><p>Second</p>")
+        self.assertEqual(text, "Breaking & important\nSecond")
+        self.assertEqual(strip_html("Plain text"), "Plain text")
+
+    def test_truncate_at_word_boundary(self):
+        """Test truncation cuts between words and marks the cut."""
+        text = truncate("The quick brown fox jumps over the lazy dog", 20)
+        self.assertTrue(len(text) <= 20)
+        self.assertEqual(text, "The quick brown fox…")
+        self.assertEqual(truncate("short", 20), "short")
+
+    def test_build_webhook_payload_enforces_limits(self):
+        """Test every oversized field is clamped to Discord's limits."""
+        embeds = [
+            {
+                "title": "t" * 500,
+                "description": "word " * 2000,
+                "url": "",
+                "author": {"name": "Someone", "icon_url": ""},
+            },
+            {"title": "Article", "description": "word " * 2000, "url": "x"},
+        ]
+        payload = build_webhook_payload(
+            embeds, username="", avatar_url="", thread_name="n " * 100
+        )
+
+        total = 0
+        for embed in payload["embeds"]:
+            self.assertTrue(len(embed["title"]) <= MAX_EMBED_TITLE)
+            self.assertTrue(len(embed.get("description", "")) <= MAX_EMBED_DESCRIPTION)
+            self.assertNotIn("url", embed)
+            total += len(embed["title"]) + len(embed.get("description", ""))
+            total += len(embed.get("author", {}).get("name", ""))
+        self.assertTrue(total <= MAX_EMBED_TOTAL)
+        self.assertNotIn("icon_url", payload["embeds"][0]["author"])
+        self.assertNotIn("username", payload)
+        self.assertNotIn("avatar_url", payload)
+        self.assertTrue(len(payload["thread_name"]) <= MAX_THREAD_NAME)
+
+    def test_build_webhook_payload_handles_missing_values(self):
+        """Test None fields are dropped instead of raising."""
+        payload = build_webhook_payload(
+            [
+                {"title": None, "description": "x"},
+                {"title": "t", "author": {"name": None}, "footer": {"text": None}},
+            ]
+        )
+        self.assertEqual(payload["embeds"], [{"description": "x"}, {"title": "t"}])
+
+    def test_build_webhook_payload_replaces_reserved_usernames(self):
+        """Test usernames Discord rejects fall back to the bot's name."""
+        for name in ("Discord Updates", "clyde", "ClydeFan"):
+            payload = build_webhook_payload([], username=name)
+            self.assertEqual(payload["username"], "News Bot")
+        self.assertEqual(build_webhook_payload([], username="Jane")["username"], "Jane")
+
+    def test_build_webhook_payload_fast_path(self):
+        """Test payloads already within limits pass through unchanged."""
+        embed = {
+            "title": "Title",
+            "description": "Body",
+            "url": "https://example.com",
+            "color": 3447003,
+        }
+        payload = build_webhook_payload([embed], username="News Bot")
+        self.assertEqual(payload["embeds"], [embed])
+        self.assertEqual(payload["username"], "News Bot")
+
+
+if __name__ == "__main__":
+    unittest.main()
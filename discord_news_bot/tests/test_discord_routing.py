@@ -0,0 +1,121 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Add the `src/lambda` directory to sys.path so imports work
+sys.path.append(
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "../src/lambda"))
+)
+
+import discord_poster  # noqa: E402
+from discord_routing import load_routing_table  # noqa: E402
+
+SECRET = {
+    "webhookUrl": "https://discord.com/api/webhooks/default",
+    "forumChannelId": 1,
+    "forumServerId": 2,
+    "token": "default_token",
+    "destinations": {
+        "tech": {
+            "webhookUrl": "https://discord.com/api/webhooks/tech",
+            "token": "tech_token",
+            "postType": "channel",
+            "maxActiveThreads": 50,
+        },
+        "broken": {"token": "no_webhook"},
+    },
+    "routes": [
+        {"source": "bluesky", "feed": "Tech News", "destination": "tech"},
+        {
+            "source": "rss",
+            "feed": "https://example.com/feed",
+            "destinations": ["tech", "default"],
+        },
+        {"source": "rss", "feed": "https://other.com/feed", "destination": "broken"},
+    ],
+}
+
+
+class TestDiscordRouting(unittest.TestCase):
+
+    def test_routing_table_lookup(self):
+        """Test posts resolve to the most specific matching route."""
+        table = load_routing_table(SECRET)
+        self.assertEqual(set(table.destinations), {"default", "tech"})
+        self.assertEqual(table.destinations["tech"]["max_active_threads"], 50)
+        self.assertEqual(table.destinations["default"]["forum_channel_id"], "1")
+
+        self.assertEqual(
+            table.destinations_for({"source": "bluesky", "feed_name": "Tech News"}),
+            ("tech",),
+        )
+        self.assertEqual(
+            table.destinations_for(
+                {"source": "rss", "feed_url": "https://example.com/feed"}
+            ),
+            ("tech", "default"),
+        )
+        # Unknown feeds fall back to default
+        self.assertEqual(
+            table.destinations_for({"source": "bluesky", "feed_name": "Other"}),
+            ("default",),
+        )
+        # Routes to invalid destinations are dropped, not re-routed to default
+        self.assertEqual(
+            table.destinations_for(
+                {"source": "rss", "feed_url": "https://other.com/feed"}
+            ),
+            (),
+        )
+
+    @patch("discord_poster.STORY_CLUSTERING", False)
+    @patch(
+        "discord_poster.deliver_to_destination",
+        side_effect=lambda destination, posts, index: len(posts),
+    )
+    def test_deliver_posts_groups_by_destination(self, mock_deliver):
+        """Test posts are batched once per destination."""
+        with patch.object(discord_poster, "_routing_table", load_routing_table(SECRET)):
+            results = discord_poster.deliver_posts(
+                [
+                    {"source": "bluesky", "feed_name": "Tech News"},
+                    {"source": "bluesky", "feed_name": "World"},
+                    {"source": "rss", "feed_url": "https://example.com/feed"},
+                ]
+            )
+
+        self.assertEqual(results, {"tech": 2, "default": 2})
+        self.assertEqual(mock_deliver.call_count, 2)
+
+    @patch("discord_poster._routing_table", None)
+    @patch("discord_poster.get_discord_secret", side_effect=[{}, SECRET])
+    def test_empty_routing_table_is_not_cached(self, mock_secret):
+        """Test a failed secret read is retried on the next run."""
+        self.assertEqual(discord_poster.get_routing_table().destinations, {})
+        self.assertIn("tech", discord_poster.get_routing_table().destinations)
+        self.assertIn("tech", discord_poster.get_routing_table().destinations)
+        self.assertEqual(mock_secret.call_count, 2)
+
+    @patch("discord_poster.time.sleep")
+    def test_rate_limit_bucket_retries_429(self, mock_sleep):
+        """Test a 429 response is retried after Discord's retry_after."""
+        limited = MagicMock(status_code=429, headers={})
+        limited.json.return_value = {"retry_after": 0.5}
+        ok = MagicMock(
+            status_code=204,
+            headers={"X-RateLimit-Remaining": "4", "X-RateLimit-Reset-After": "1"},
+        )
+        bucket = discord_poster.RateLimitBucket()
+        bucket.session = MagicMock()
+        bucket.session.request.side_effect = [limited, ok]
+
+        response = bucket.request("post", "https://discord.com/api/webhooks/x")
+
+        self.assertIs(response, ok)
+        mock_sleep.assert_called_once_with(0.5)
+        self.assertEqual(bucket.remaining, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+# Add the `src/lambda` directory to sys.path so imports work
+sys.path.append(
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "../src/lambda"))
+)
+
+import feedparser  # noqa: E402
+from feed_health import (  # noqa: E402
+    CIRCUIT_BASE_COOLDOWN,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    FeedHealth,
+    format_status,
+)
+
+FEED = "rss:https://example.com/feed"
+NOW = 1_700_000_000
+
+
+class TestFeedHealth(unittest.TestCase):
+
+    def trip(self, health, now=NOW):
+        for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+            self.assertTrue(health.allow(FEED, now))
+            health.record_failure(FEED, IOError("HTTP 404"), 0.1, now)
+
+    def test_circuit_opens_after_repeated_failures(self):
+        """Test a failing feed is skipped until its cool-down expires."""
+        health = FeedHealth()
+        self.trip(health)
+
+        self.assertEqual(health.records[FEED]["state"], OPEN)
+        self.assertFalse(health.allow(FEED, NOW + 1))
+        self.assertTrue(health.allow(FEED, NOW + CIRCUIT_BASE_COOLDOWN))
+        self.assertEqual(health.records[FEED]["state"], HALF_OPEN)
+        self.assertTrue(health.is_probe(FEED))
+
+    def test_failed_probe_doubles_cooldown(self):
+        """Test each failed probe reopens the circuit for twice as long."""
+        health = FeedHealth()
+        self.trip(health)
+        probe_at = NOW + CIRCUIT_BASE_COOLDOWN
+        health.allow(FEED, probe_at)
+        health.record_failure(FEED, IOError("HTTP 404"), 0.1, probe_at)
+
+        record = health.records[FEED]
+        self.assertEqual(record["state"], OPEN)
+        self.assertEqual(record["open_until"], probe_at + 2 * CIRCUIT_BASE_COOLDOWN)
+
+    def test_successful_probe_closes_circuit(self):
+        """Test a recovered feed is fetched normally again."""
+        health = FeedHealth()
+        self.trip(health)
+        probe_at = NOW + CIRCUIT_BASE_COOLDOWN
+        health.allow(FEED, probe_at)
+        health.record_success(FEED, 0.2, probe_at)
+
+        record = health.records[FEED]
+        self.assertEqual(record["state"], CLOSED)
+        self.assertEqual(record["trips"], 0)
+        self.assertEqual(record["last_success"], probe_at)
+        self.assertIn("🟢 " + FEED, format_status(health, probe_at))
+
+    def test_round_trip_through_state_document(self):
+        """Test health records survive being saved and reloaded."""
+        health = FeedHealth()
+        self.trip(health)
+        restored = FeedHealth(health.to_dict()["feeds"])
+        self.assertFalse(restored.allow(FEED, NOW + 1))
+        self.assertIn("retry in", format_status(restored, NOW + 1))
+
+    @patch("sources.rss_client.save_feed_health")
+    @patch("sources.rss_client.load_feed_health")
+    @patch("sources.rss_client.save_processed_posts")
+    @patch("sources.rss_client.load_processed_posts", return_value=set())
+    def test_entry_without_description_is_not_a_feed_failure(
+        self, _load_posts, _save_posts, mock_load_health, _save_health
+    ):
+        """Test valid entries missing optional fields don't trip the circuit."""
+        from sources import rss_client
+
+        health = FeedHealth()
+        mock_load_health.return_value = health
+        feed = feedparser.parse(
+            "<rss version='2.0'><channel><title>Example</title>"
+            "<item><title>Only a title</title>"
+            "<link>https://example.com/1</link></item>"
+            "</channel></rss>"
+        )
+        with patch.dict(os.environ, {"RSS_FEEDS": "https://example.com/feed"}), patch(
+            "sources.rss_client.feedparser.parse", return_value=feed
+        ):
+            articles = rss_client.fetch_rss_posts()
+
+        self.assertEqual(len(articles), 1)
+        self.assertEqual(articles[0]["content"], "")
+        self.assertEqual(health.records[FEED]["consecutive_failures"], 0)
+        self.assertEqual(health.records[FEED]["state"], CLOSED)
+
+    @patch("sources.rss_client.save_feed_health")
+    @patch("sources.rss_client.load_feed_health")
+    @patch("sources.rss_client.load_processed_posts", return_value=set())
+    def test_validators_not_stored_when_processing_fails(
+        self, _load_posts, mock_load_health, _save_health
+    ):
+        """Test a failed run doesn't leave an ETag that hides entries behind a 304."""
+        from sources import rss_client
+
+        health = FeedHealth()
+        mock_load_health.return_value = health
+        feed = feedparser.parse("<rss version='2.0'><channel></channel></rss>")
+        feed["etag"] = '"v1"'
+        feed["entries"] = None  # Slicing raises mid-processing
+        with patch.dict(os.environ, {"RSS_FEEDS": "https://example.com/feed"}), patch(
+            "sources.rss_client.feedparser.parse", return_value=feed
+        ), patch.dict(rss_client._feed_validators, clear=True):
+            rss_client.fetch_rss_posts()
+            self.assertNotIn("https://example.com/feed", rss_client._feed_validators)
+
+        self.assertEqual(health.records[FEED]["consecutive_failures"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
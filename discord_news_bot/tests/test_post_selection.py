@@ -0,0 +1,105 @@
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+# Add the `src/lambda` directory to sys.path so imports work
+sys.path.append(
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "../src/lambda"))
+)
+
+import post_selection  # noqa: E402
+from post_selection import rank_and_select, score_post  # noqa: E402
+
+NOW = 1_700_000_000
+
+
+def make_post(feed, n, likes=0):
+    return {
+        "feed_name": feed,
+        "post_url": f"https://example.com/{feed}/{n}",
+        "likes": likes,
+    }
+
+
+class TestPostSelection(unittest.TestCase):
+
+    def test_score_prefers_engagement_and_recency(self):
+        """Test engagement raises scores and age decays them."""
+        quiet = make_post("a", 1)
+        popular = make_post("a", 2, likes=100)
+        old_popular = {**popular, "created_at": "2023-11-14T16:13:20Z"}
+        self.assertTrue(score_post(popular, NOW) > score_post(quiet, NOW))
+        self.assertTrue(
+            score_post(old_popular, NOW + 6 * 3600) < score_post(popular, NOW)
+        )
+
+    def test_noisy_feed_cannot_take_whole_budget(self):
+        """Test fair-share quotas keep room for quieter feeds."""
+        noisy = [make_post("noisy", n, likes=100 + n) for n in range(10)]
+        quiet = [make_post("quiet", n) for n in range(2)]
+        selected, held = rank_and_select(noisy + quiet, 4, feed_quota=0, now=NOW)
+
+        self.assertEqual(len(selected), 4)
+        self.assertEqual(sum(p["feed_name"] == "quiet" for p in selected), 2)
+        self.assertEqual(selected[0]["likes"], 109)
+        self.assertEqual(len(held), 8)
+
+    def test_fair_share_budget_is_work_conserving(self):
+        """Test unused quota from quiet feeds goes to the best remaining posts."""
+        noisy = [make_post("noisy", n, likes=n) for n in range(10)]
+        quiet = [make_post("quiet", 0)]
+        selected, _ = rank_and_select(noisy + quiet, 6, feed_quota=0, now=NOW)
+        self.assertEqual(len(selected), 6)
+
+        selected, _ = rank_and_select(noisy + quiet, 6, feed_quota=2, now=NOW)
+        self.assertEqual(len(selected), 3)  # Explicit quotas are hard caps
+
+    def test_explicit_quota_applies_within_budget(self):
+        """Test an explicit quota caps feeds even when the budget isn't hit."""
+        posts = [make_post("a", n, likes=n) for n in range(10)] + [make_post("b", 0)]
+        for budget in (20, 0):
+            selected, held = rank_and_select(posts, budget, feed_quota=2, now=NOW)
+            self.assertEqual(len(selected), 3)
+            self.assertEqual(sum(p["feed_name"] == "a" for p in selected), 2)
+            self.assertEqual(len(held), 8)
+
+    @patch("post_selection.save_json")
+    @patch("post_selection.load_json")
+    def test_select_posts_holds_overflow(self, mock_load, mock_save):
+        """Test posts over budget are saved for the next run, not dropped."""
+        deferred = {**make_post("a", 0, likes=500), "deferred_at": NOW}
+        mock_load.return_value = {"deferred": [deferred], "sent": []}
+
+        with patch.object(post_selection, "MAX_POSTS_PER_RUN", 2), patch(
+            "post_selection.time.time", return_value=NOW + 60
+        ):
+            selected = post_selection.select_posts(
+                [make_post("b", n) for n in range(3)]
+            )
+
+        self.assertEqual(len(selected), 2)
+        self.assertIn(deferred, selected)
+        state = mock_save.call_args[0][1]
+        self.assertEqual(len(state["deferred"]), 2)
+        self.assertEqual(len(state["sent"]), 2)
+
+    @patch("post_selection.save_json")
+    @patch("post_selection.load_json", return_value={})
+    def test_posts_sharing_an_article_are_kept(self, _load, _save):
+        """Test two accounts sharing the same article URL aren't merged."""
+        posts = [
+            {
+                "author_name": author,
+                "post_url": "https://news.example.com/story",
+                "bluesky_link": f"https://bsky.app/profile/{author}/post/1",
+            }
+            for author in ("A", "B")
+        ]
+        with patch.object(post_selection, "MAX_POSTS_PER_RUN", 20):
+            selected = post_selection.select_posts(posts)
+        self.assertEqual(sorted(p["author_name"] for p in selected), ["A", "B"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+# Add the `src/lambda` and `tools` directories to sys.path so imports work
+sys.path.append(
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "../src/lambda"))
+)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../tools")))
+
+import profiling  # noqa: E402
+from profile_diff import diff_profiles  # noqa: E402
+
+
+def busy_handler(event, context):
+    """Allocates and calls into urllib so every profile section has data."""
+    data = [str(i) * 10 for i in range(20000)]
+    opener = urllib.request.OpenerDirector()
+    try:
+        opener.open("http://feeds.example.com/rss")
+    except Exception:
+        pass  # No handlers are installed; only the timing matters
+    return {"statusCode": 200, "body": len(data)}
+
+
+def worker_task(n):
+    return sum(range(n))
+
+
+def threaded_handler(event, context):
+    """Does its work on a thread pool, like deliver_posts."""
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        total = sum(executor.map(worker_task, [10000, 20000]))
+    return {"statusCode": 200, "body": total}
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        patcher = patch.multiple(
+            profiling, PROFILE_DIR=self.tmp.name, PROFILE_UPLOAD=False
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_disabled_by_default(self):
+        """Test unflagged invocations run without writing artifacts."""
+        handler = profiling.profiled(busy_handler)
+        self.assertEqual(handler({}, None)["statusCode"], 200)
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_event_flag_writes_profile(self):
+        """Test a profiled invocation writes a summary and raw pstats."""
+        original_open = urllib.request.OpenerDirector.open
+        handler = profiling.profiled(busy_handler)
+        self.assertEqual(handler({"profile": True}, None)["statusCode"], 200)
+
+        files = sorted(os.listdir(self.tmp.name))
+        self.assertEqual([os.path.splitext(f)[1] for f in files], [".json", ".pstats"])
+        with open(os.path.join(self.tmp.name, files[0])) as f:
+            summary = json.load(f)
+
+        self.assertIn("feeds.example.com", summary["http"])
+        self.assertTrue(
+            any("busy_handler" in row["function"] for row in summary["functions"])
+        )
+        self.assertTrue(summary["allocations"])
+        self.assertTrue(summary["peak_memory_kb"] > 0)
+        # The transport patches are removed once the invocation finishes
+        self.assertIs(urllib.request.OpenerDirector.open, original_open)
+
+        report = diff_profiles(summary, {**summary, "wall_seconds": 2.0})
+        self.assertIn("Wall time:", report)
+        self.assertIn("feeds.example.com", report)
+
+    def test_worker_threads_are_profiled(self):
+        """Test functions run on worker threads appear in the profile."""
+        handler = profiling.profiled(threaded_handler)
+        self.assertEqual(handler({"profile": True}, None)["statusCode"], 200)
+
+        summary_file = next(f for f in os.listdir(self.tmp.name) if f.endswith(".json"))
+        with open(os.path.join(self.tmp.name, summary_file)) as f:
+            summary = json.load(f)
+        self.assertTrue(summary["threads_profiled"] > 1)
+        self.assertTrue(
+            any("worker_task" in row["function"] for row in summary["functions"])
+        )
+        self.assertIsNone(profiling.threading.getprofile())
+
+
+if __name__ == "__main__":
+    unittest.main()
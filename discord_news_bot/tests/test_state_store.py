@@ -0,0 +1,101 @@
+import io
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+from botocore.exceptions import ClientError
+
+# Add the `src/lambda` directory to sys.path so imports work
+sys.path.append(
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "../src/lambda"))
+)
+
+import state_store  # noqa: E402
+
+
+def s3_response(body, etag):
+    return {"Body": io.BytesIO(body.encode()), "ETag": etag}
+
+
+NOT_MODIFIED = ClientError(
+    {"Error": {"Code": "304"}, "ResponseMetadata": {"HTTPStatusCode": 304}},
+    "GetObject",
+)
+
+
+class TestStateStore(unittest.TestCase):
+
+    def setUp(self):
+        state_store.clear_cache()
+
+    @patch("state_store.s3_client")
+    def test_warm_load_reuses_cache_when_unchanged(self, mock_s3):
+        """Test a second load sends the ETag and reuses the cached document."""
+        mock_s3.get_object.side_effect = [
+            s3_response('{"processed_posts": ["a"]}', '"v1"'),
+            NOT_MODIFIED,
+        ]
+
+        first = state_store.load_json("processed_posts.json", {})
+        second = state_store.load_json("processed_posts.json", {})
+
+        self.assertIs(first, second)
+        self.assertEqual(mock_s3.get_object.call_args.kwargs["IfNoneMatch"], '"v1"')
+
+    @patch("state_store.s3_client")
+    def test_load_refreshes_after_another_writer(self, mock_s3):
+        """Test a changed document is downloaded again."""
+        mock_s3.get_object.side_effect = [
+            s3_response('{"n": 1}', '"v1"'),
+            s3_response('{"n": 2}', '"v2"'),
+        ]
+        state_store.load_json("state.json")
+        self.assertEqual(state_store.load_json("state.json"), {"n": 2})
+
+    @patch("state_store.s3_client")
+    def test_save_primes_cache(self, mock_s3):
+        """Test saving records the new ETag so the next load is conditional."""
+        mock_s3.put_object.return_value = {"ETag": '"v3"'}
+        mock_s3.get_object.side_effect = NOT_MODIFIED
+
+        state_store.save_json("state.json", {"n": 3})
+
+        self.assertEqual(state_store.load_json("state.json"), {"n": 3})
+        self.assertEqual(mock_s3.get_object.call_args.kwargs["IfNoneMatch"], '"v3"')
+
+    @patch("state_store._write_behind", True)
+    @patch("state_store.s3_client")
+    def test_write_behind_defers_saves_to_flush(self, mock_s3):
+        """Test daemon mode keeps state in memory until a snapshot."""
+        mock_s3.put_object.return_value = {"ETag": '"v4"'}
+
+        state_store.save_json("state.json", {"n": 4})
+        self.assertEqual(state_store.load_json("state.json"), {"n": 4})
+        mock_s3.get_object.assert_not_called()
+        mock_s3.put_object.assert_not_called()
+
+        self.assertEqual(state_store.flush(), 1)
+        self.assertEqual(state_store.flush(), 0)
+        mock_s3.put_object.assert_called_once()
+
+    def test_incomplete_bluesky_credentials_are_not_cached(self):
+        """Test a secret missing keys is re-read on the next warm run."""
+        from sources import bluesky_client
+
+        responses = [
+            {"SecretString": '{"username": "bot"}'},
+            {"SecretString": '{"username": "bot", "password": "pw"}'},
+        ]
+        with patch.object(bluesky_client, "_credentials", None), patch.object(
+            bluesky_client, "secrets_client"
+        ) as mock_secrets:
+            mock_secrets.get_secret_value.side_effect = responses
+            self.assertEqual(bluesky_client.get_bluesky_credentials(), ("bot", None))
+            self.assertEqual(bluesky_client.get_bluesky_credentials(), ("bot", "pw"))
+            self.assertEqual(bluesky_client.get_bluesky_credentials(), ("bot", "pw"))
+            self.assertEqual(mock_secrets.get_secret_value.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
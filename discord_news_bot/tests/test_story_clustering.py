@@ -0,0 +1,104 @@
+import os
+import sys
+import unittest
+
+# Add the `src/lambda` directory to sys.path so imports work
+sys.path.append(
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "../src/lambda"))
+)
+
+from story_clustering import (  # noqa: E402
+    STORY_MAX_DISTANCE,
+    StoryIndex,
+    fingerprint_batch,
+    hamming_distance,
+)
+
+HEADLINE = "Senate passes bipartisan infrastructure bill in 69-30 vote"
+REWORDED = "Senate approves bipartisan infrastructure bill 69-30"
+UNRELATED = "Local team wins championship after dramatic overtime goal in final"
+
+# (headline, the same story as worded by another outlet, a different story on
+# the same topic)
+STORIES = [
+    (HEADLINE, REWORDED, "Senate rejects border security bill in 49-50 vote"),
+    (
+        "Magnitude 7.4 earthquake strikes Taiwan, killing at least nine",
+        "At least nine killed as 7.4 magnitude earthquake hits Taiwan",
+        "Magnitude 6.1 earthquake strikes off coast of Japan, no tsunami warning",
+    ),
+    (
+        "OpenAI launches GPT-4o model with real-time voice capabilities",
+        "OpenAI releases GPT-4o, a model with real-time voice features",
+        "OpenAI CEO Sam Altman returns after board ousting",
+    ),
+    (
+        "Microsoft outage grounds flights and disrupts banks worldwide",
+        "Global Microsoft outage disrupts banks and grounds flights",
+        "Microsoft to acquire Activision Blizzard for 69 billion dollars",
+    ),
+    (
+        "UK inflation falls to 2% for first time in three years",
+        "UK inflation drops to 2 percent, first time in three years",
+        "UK unemployment rises to 4.4 percent",
+    ),
+    (
+        "Japan's Nikkei plunges 12% in worst day since 1987",
+        "Nikkei suffers worst day since 1987, plunging 12 percent",
+        "Japan's central bank raises interest rates for first time in 17 years",
+    ),
+]
+
+
+def make_post(content, author):
+    return {
+        "title": content[:100] + "...",
+        "content": content,
+        "author_name": author,
+        "post_url": f"https://example.com/{author}",
+        "source": "bluesky",
+    }
+
+
+class TestStoryClustering(unittest.TestCase):
+
+    def test_fingerprints_are_close_for_near_duplicates(self):
+        """Test reworded stories from different outlets match; others don't."""
+        for headline, reworded, different in STORIES:
+            a, b, c = fingerprint_batch([headline, reworded, different])
+            with self.subTest(headline=headline):
+                self.assertTrue(hamming_distance(a, b) <= STORY_MAX_DISTANCE)
+                self.assertTrue(hamming_distance(a, c) > STORY_MAX_DISTANCE)
+                self.assertTrue(hamming_distance(b, c) > STORY_MAX_DISTANCE)
+        self.assertEqual(fingerprint_batch(["", "a"]), [None, None])
+
+    def test_cluster_collapses_batch_duplicates(self):
+        """Test near-duplicates in one batch are attached to the first post."""
+        index = StoryIndex()
+        posts = [
+            make_post(HEADLINE, "outlet_a"),
+            make_post(UNRELATED, "outlet_b"),
+            make_post(REWORDED, "outlet_c"),
+        ]
+        clusters = index.cluster("default", posts)
+
+        self.assertEqual(len(clusters), 2)
+        self.assertEqual(clusters[0]["duplicates"], [posts[2]])
+        self.assertIsNone(clusters[0]["story"])
+
+    def test_cluster_matches_previous_stories(self):
+        """Test posts matching the rolling index become follow-ups."""
+        index = StoryIndex()
+        [fingerprint] = fingerprint_batch([HEADLINE])
+        index.add("default", make_post(HEADLINE, "outlet_a"), fingerprint, "123")
+        restored = StoryIndex.from_dict(index.to_dict())
+
+        clusters = restored.cluster("default", [make_post(REWORDED, "outlet_b")])
+        self.assertEqual(clusters[0]["story"]["thread_id"], "123")
+        # Stories are only matched within the same destination
+        clusters = restored.cluster("other", [make_post(REWORDED, "outlet_b")])
+        self.assertIsNone(clusters[0]["story"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,223 @@
+"""
+Checks the synthesized Lambda package against a size and import-time budget.
+
+Usage: python tools/check_package_budget.py [--skip-synth] [--skip-import]
+           [--max-unzipped-mb N] [--max-zipped-mb N] [--max-import-seconds N]
+
+Runs `cdk synth` (which bundles the function and layer assets into cdk.out),
+then reports each function's unzipped and zipped size (code + layers), the
+largest packages, and the time taken to import the handler module. Exits
+non-zero if any budget is exceeded.
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import zipfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CDK_DIR = os.path.join(ROOT, "src", "cdk")
+MB = 1024 * 1024
+
+# Budgets (Lambda's hard limit is 250 MB unzipped across code and layers)
+MAX_UNZIPPED_MB = float(os.getenv("PACKAGE_MAX_UNZIPPED_MB", 120))
+MAX_ZIPPED_MB = float(os.getenv("PACKAGE_MAX_ZIPPED_MB", 40))
+MAX_IMPORT_SECONDS = float(os.getenv("PACKAGE_MAX_IMPORT_SECONDS", 2.5))
+HOST_ARCHITECTURE = {"x86_64": "x86_64", "amd64": "x86_64", "aarch64": "arm64"}.get(
+    platform.machine().lower(), platform.machine().lower()
+)
+
+
+def dir_size(path):
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(path)
+        for name in files
+    )
+
+
+def zipped_size(path):
+    """Size of the directory as a deflated zip, as uploaded to Lambda."""
+    with tempfile.TemporaryFile() as tmp:
+        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as archive:
+            for root, _, files in os.walk(path):
+                for name in files:
+                    full = os.path.join(root, name)
+                    archive.write(full, os.path.relpath(full, path))
+        return tmp.tell()
+
+
+def largest_entries(paths, limit=10):
+    """Top-level packages/modules by size across the given directories."""
+    entries = []
+    for path in paths:
+        for name in os.listdir(path):
+            full = os.path.join(path, name)
+            size = dir_size(full) if os.path.isdir(full) else os.path.getsize(full)
+            entries.append((size, name))
+    return sorted(entries, reverse=True)[:limit]
+
+
+def measure_import(handler_module, python_paths):
+    """
+    Imports the handler in a fresh interpreter with -X importtime.
+    Returns (total seconds, [(seconds, module)]) for the handler's slowest
+    direct imports.
+    """
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(python_paths),
+        "PYTHONDONTWRITEBYTECODE": "1",
+        "AWS_DEFAULT_REGION": os.environ.get("AWS_DEFAULT_REGION", "us-east-1"),
+    }
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {handler_module}"],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {handler_module} failed:\n{result.stderr}")
+
+    # "import time: self [us] | cumulative | <indent>name". Nested imports are
+    # indented two spaces per level and printed before their parent, so the
+    # handler's direct imports are the depth-1 lines just before it.
+    children = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[12:].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        seconds = int(cumulative) / 1e6
+        if depth == 1:
+            children.append((seconds, name.strip()))
+        elif depth == 0:
+            if name.strip() == handler_module:
+                return seconds, sorted(children, reverse=True)[:10]
+            children = []
+    return 0.0, []
+
+
+def find_functions(cdk_out):
+    """
+    Yields (stack, function id, architecture, handler, code dir, layer dirs)
+    for each Lambda function in the synthesized templates.
+    """
+    for template_path in glob.glob(os.path.join(cdk_out, "*.template.json")):
+        stack = os.path.basename(template_path)[: -len(".template.json")]
+        with open(template_path) as f:
+            resources = json.load(f).get("Resources", {})
+        assets_path = os.path.join(cdk_out, f"{stack}.assets.json")
+        if not os.path.exists(assets_path):
+            continue
+        with open(assets_path) as f:
+            files = json.load(f).get("files", {})
+
+        def asset_dir(location):
+            asset_hash = location.get("S3Key", "").split(".")[0]
+            source = files.get(asset_hash, {}).get("source", {})
+            return os.path.join(cdk_out, source["path"]) if source else None
+
+        for logical_id, resource in resources.items():
+            if resource["Type"] != "AWS::Lambda::Function":
+                continue
+            props = resource["Properties"]
+            layers = [
+                asset_dir(resources[layer["Ref"]]["Properties"]["Content"])
+                for layer in props.get("Layers", [])
+                if isinstance(layer, dict) and "Ref" in layer
+            ]
+            yield (
+                stack,
+                logical_id,
+                props.get("Architectures", ["x86_64"])[0],
+                props.get("Handler", ""),
+                asset_dir(props.get("Code", {})),
+                [layer for layer in layers if layer],
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cdk-out", default=os.path.join(CDK_DIR, "cdk.out"))
+    parser.add_argument("--skip-synth", action="store_true")
+    parser.add_argument("--skip-import", action="store_true")
+    parser.add_argument("--max-unzipped-mb", type=float, default=MAX_UNZIPPED_MB)
+    parser.add_argument("--max-zipped-mb", type=float, default=MAX_ZIPPED_MB)
+    parser.add_argument("--max-import-seconds", type=float, default=MAX_IMPORT_SECONDS)
+    args = parser.parse_args()
+
+    if not args.skip_synth:
+        print("Synthesizing CDK app...")
+        subprocess.run(
+            ["cdk", "synth", "-q", "-o", args.cdk_out], cwd=CDK_DIR, check=True
+        )
+
+    failures = []
+    functions = list(find_functions(args.cdk_out))
+    if not functions:
+        sys.exit(f"No bundled Lambda functions found in {args.cdk_out}")
+
+    for stack, function, architecture, handler, code_dir, layer_dirs in functions:
+        if not code_dir or not os.path.isdir(code_dir):
+            failures.append(f"{function}: code asset was not bundled")
+            continue
+        layer_python_dirs = [os.path.join(d, "python") for d in layer_dirs]
+        dirs = [code_dir] + layer_dirs
+
+        unzipped = sum(dir_size(d) for d in dirs) / MB
+        zipped = sum(zipped_size(d) for d in dirs) / MB
+        print(f"\n{stack}/{function} ({architecture}, {len(layer_dirs)} layers)")
+        print(f"  code:     {dir_size(code_dir) / MB:8.2f} MB unzipped")
+        for layer in layer_dirs:
+            print(f"  layer:    {dir_size(layer) / MB:8.2f} MB unzipped")
+        print(f"  total:    {unzipped:8.2f} MB unzipped, {zipped:.2f} MB zipped")
+        print("  largest packages:")
+        for size, name in largest_entries(
+            [code_dir] + [d for d in layer_python_dirs if os.path.isdir(d)]
+        ):
+            print(f"    {size / MB:8.2f} MB  {name}")
+
+        if unzipped > args.max_unzipped_mb:
+            failures.append(
+                f"{function}: {unzipped:.2f} MB unzipped > {args.max_unzipped_mb} MB"
+            )
+        if zipped > args.max_zipped_mb:
+            failures.append(
+                f"{function}: {zipped:.2f} MB zipped > {args.max_zipped_mb} MB"
+            )
+
+        if args.skip_import:
+            continue
+        if architecture != HOST_ARCHITECTURE:
+            print(
+                f"  import:   skipped ({architecture} package on {HOST_ARCHITECTURE})"
+            )
+            continue
+        handler_module = handler.rsplit(".", 1)[0]
+        seconds, slowest = measure_import(
+            handler_module, [code_dir] + layer_python_dirs
+        )
+        print(f"  import:   {seconds:.3f}s for {handler_module}")
+        for module_seconds, module in slowest:
+            print(f"    {module_seconds:8.3f}s  {module}")
+        if seconds > args.max_import_seconds:
+            failures.append(
+                f"{function}: import takes {seconds:.3f}s > {args.max_import_seconds}s"
+            )
+
+    if failures:
+        print("\n❌ Package budget exceeded:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\n✅ Package within budget.")
+
+
+if __name__ == "__main__":
+    main()
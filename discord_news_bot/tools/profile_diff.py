@@ -0,0 +1,78 @@
+"""
+Compares two profile summaries written by src/lambda/profiling.py.
+
+Usage: python tools/profile_diff.py BEFORE.json AFTER.json [--top N]
+
+Fetch summaries from the state bucket with e.g.
+aws s3 cp s3://<bucket>/profiles/<name>.json .
+"""
+
+import argparse
+import json
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def diff_rows(before, after, key, value):
+    """Returns (name, before, after, delta) rows sorted by largest change."""
+    old = {row[key]: row[value] for row in before}
+    new = {row[key]: row[value] for row in after}
+    rows = [
+        (name, old.get(name, 0), new.get(name, 0), new.get(name, 0) - old.get(name, 0))
+        for name in old.keys() | new.keys()
+    ]
+    return sorted(rows, key=lambda r: abs(r[3]), reverse=True)
+
+
+def diff_profiles(before, after, top=15):
+    """Builds the printable report comparing two profile summaries."""
+    lines = [
+        f"Profile diff: {before['name']} -> {after['name']}",
+        f"Wall time: {before['wall_seconds']:.3f}s -> {after['wall_seconds']:.3f}s "
+        f"({after['wall_seconds'] - before['wall_seconds']:+.3f}s)",
+        f"Peak memory: {before['peak_memory_kb']:.0f} KB -> "
+        f"{after['peak_memory_kb']:.0f} KB",
+    ]
+
+    sections = (
+        ("HTTP time by host (s)", "http", None, "seconds", "{:.3f}"),
+        (
+            "Cumulative time by function (s)",
+            "functions",
+            "function",
+            "cumtime",
+            "{:.3f}",
+        ),
+        (
+            "Allocations alive at end by line (KB)",
+            "allocations",
+            "location",
+            "size_kb",
+            "{:.1f}",
+        ),
+    )
+    for title, section, key, value, fmt in sections:
+        old, new = before.get(section, []), after.get(section, [])
+        if key is None:  # {host: {...}} mapping
+            old = [{"name": k, **v} for k, v in old.items()]
+            new = [{"name": k, **v} for k, v in new.items()]
+            key = "name"
+        lines += ["", title]
+        for name, a, b, delta in diff_rows(old, new, key, value)[:top]:
+            lines.append(
+                f"  {fmt.format(a):>10} -> {fmt.format(b):>10} "
+                f"({'+' if delta >= 0 else ''}{fmt.format(delta)})  {name}"
+            )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    print(diff_profiles(load(args.before), load(args.after), args.top))